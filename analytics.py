@@ -1,6 +1,8 @@
 import numpy as np
+import time
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import func
+from config import Config
 from database import SessionLocal, Video, ViewSnapshot, ChannelStats
 import logging
 
@@ -9,9 +11,22 @@ logger = logging.getLogger(__name__)
 class VideoAnalytics:
     def __init__(self):
         self.db = SessionLocal()
+        # (channel_id, recent_videos_count) -> (cached_at, average_views)
+        self._average_cache = {}
+        
+    def invalidate_channel_average(self, channel_id):
+        """Drop cached averages for a channel after new videos are stored"""
+        self._average_cache = {
+            key: value for key, value in self._average_cache.items() if key[0] != channel_id
+        }
         
     def calculate_channel_average_views(self, channel_id, recent_videos_count=25):
         """Calculate average views from the last N videos of a channel"""
+        cache_key = (channel_id, recent_videos_count)
+        cached = self._average_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < Config.CHANNEL_AVERAGE_CACHE_SECONDS:
+            return cached[1]
+            
         # Get the last N videos from the channel
         recent_videos = self.db.query(Video).filter(
             Video.channel_id == channel_id
@@ -27,11 +42,12 @@ class VideoAnalytics:
         
         logger.info(f"Channel {channel_id}: Average views from last {len(recent_videos)} videos = {average_views:,.0f}")
         
+        self._average_cache[cache_key] = (time.monotonic(), average_views)
         return average_views
         
     def is_video_above_average(self, video_id, recent_videos_count=25):
         """Check if video performs above the channel's recent average"""
-        video = self.db.query(Video).filter_by(video_id=video_id).first()
+        video = self.db.get(Video, video_id)
         if not video:
             logger.warning(f"Video {video_id} not found in database")
             return False, {}
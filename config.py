@@ -17,10 +17,23 @@ class Config:
     # Monitoring Settings
     CHECK_INTERVAL_MINUTES = int(os.getenv('CHECK_INTERVAL_MINUTES', 60))
     VIEW_THRESHOLD_PERCENTILE = int(os.getenv('VIEW_THRESHOLD_PERCENTILE', 75))
+    CHANNEL_CHECK_CONCURRENCY = int(os.getenv('CHANNEL_CHECK_CONCURRENCY', 4))
+    COMMAND_QUERY_WARNING_THRESHOLD = int(os.getenv('COMMAND_QUERY_WARNING_THRESHOLD', 10))
     
     # API Quotas
     MAX_RESULTS_PER_REQUEST = 50
     QUOTA_COST_PER_LIST = 1
     DAILY_QUOTA_LIMIT = 10000
     QUOTA_WARNING_THRESHOLD = int(os.getenv('QUOTA_WARNING_THRESHOLD', 8000))
-    QUOTA_EMERGENCY_THRESHOLD = int(os.getenv('QUOTA_EMERGENCY_THRESHOLD', 9500)) 
\ No newline at end of file
+    QUOTA_EMERGENCY_THRESHOLD = int(os.getenv('QUOTA_EMERGENCY_THRESHOLD', 9500))
+    QUOTA_STATUS_CACHE_SECONDS = 5
+    QUOTA_COMMIT_INTERVAL = 10
+    YTDLP_MAX_WORKERS = 8
+    ETAG_CACHE_SIZE = 2048
+    STATS_CACHE_SECONDS = 5
+    CHANNEL_AVERAGE_CACHE_SECONDS = 600
+    
+    # Transcripts
+    TRANSCRIPT_CACHE_DIR = os.getenv('TRANSCRIPT_CACHE_DIR', 'transcript_cache')
+    TRANSCRIPT_MEMORY_CACHE_SIZE = 1024
+    TRANSCRIPT_CACHE_DAYS = 7 
\ No newline at end of file
@@ -1,11 +1,18 @@
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Boolean, Text
+from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Boolean, Text, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 from config import Config
 
 Base = declarative_base()
-engine = create_engine(Config.DATABASE_URL)
+
+# Keep warm connections around and drop dead ones before handing them out.
+# SQLite uses its own file-based pooling, so sizing and hourly recycling only apply
+# to server databases.
+engine_options = {'pool_pre_ping': True}
+if not Config.DATABASE_URL.startswith('sqlite'):
+    engine_options.update(pool_size=10, max_overflow=20, pool_recycle=3600)
+engine = create_engine(Config.DATABASE_URL, **engine_options)
 SessionLocal = sessionmaker(bind=engine)
 
 class Channel(Base):
@@ -24,6 +31,16 @@ class Channel(Base):
 
 class Video(Base):
     __tablename__ = 'videos'
+    __table_args__ = (
+        # Per-channel recent shorts (stats refresh, threshold checks); equality
+        # columns first so the published_at range stays within the index scan
+        Index('ix_video_recent', 'channel_id', 'is_short', 'published_at'),
+        # Cross-channel shorts listings ordered by publish date
+        Index('ix_video_is_short_pub', 'is_short', 'published_at'),
+        # All-time top shorts, overall and per channel, ordered by views
+        Index('ix_video_is_short_views', 'is_short', 'view_count'),
+        Index('ix_video_channel_short_views', 'channel_id', 'is_short', 'view_count'),
+    )
     
     video_id = Column(String, primary_key=True)
     channel_id = Column(String, index=True)
@@ -80,4 +97,15 @@ class ApiKeyUsage(Base):
     last_error = Column(DateTime)
 
 # Create tables
-Base.metadata.create_all(engine) 
\ No newline at end of file
+Base.metadata.create_all(engine)
+
+def upgrade_schema():
+    """Add indexes newer than an existing database and drop superseded ones"""
+    # create_all skips tables that already exist, so add any newer indexes explicitly
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+            
+    # Superseded by ix_video_recent
+    with engine.begin() as conn:
+        conn.execute(text('DROP INDEX IF EXISTS ix_video_channel_pub_short')) 
\ No newline at end of file
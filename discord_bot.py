@@ -1,9 +1,26 @@
 import discord
 from discord import app_commands
 import asyncio
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 from config import Config
 
+@dataclass(slots=True)
+class VideoDTO:
+    """Video fields needed to build a notification embed"""
+    video_id: str
+    title: str
+    description: str
+    published_at: datetime
+    thumbnail_url: str
+    view_count: int
+    like_count: int
+    comment_count: int
+    duration_seconds: int = 0
+    is_short: bool = False
+    transcript_preview: Optional[str] = None
+
 class YouTubeBot(discord.Client):
     def __init__(self):
         intents = discord.Intents.default()
@@ -27,23 +44,59 @@ class YouTubeBot(discord.Client):
         except Exception as e:
             print(f"❌ Failed to sync commands: {e}")
         
-    async def send_notification(self, channel_id, embed):
-        """Send notification to specified channel"""
+    async def send_notifications(self, channel_id, embeds):
+        """Send notifications to specified channel, returning the indexes of the embeds that were sent"""
         channel = self.get_channel(channel_id)
-        if channel:
-            await channel.send(embed=embed)
+        if not channel:
+            return []
+            
+        # Discord allows up to 10 embeds and 6000 embed characters per message
+        sent = []
+        batch = []
+        batch_length = 0
+        for index, embed in enumerate(embeds):
+            if batch and (len(batch) == 10 or batch_length + len(embed) > 6000):
+                sent.extend(await self._send_embed_batch(channel, embeds, batch))
+                batch = []
+                batch_length = 0
+            batch.append(index)
+            batch_length += len(embed)
             
+        if batch:
+            sent.extend(await self._send_embed_batch(channel, embeds, batch))
+        return sent
+        
+    async def _send_embed_batch(self, channel, embeds, indexes):
+        """Send embeds in one message, falling back to one message each if the batch fails"""
+        try:
+            await channel.send(embeds=[embeds[index] for index in indexes])
+            return indexes
+        except discord.HTTPException as e:
+            print(f"❌ Failed to send {len(indexes)} notification(s) together: {e}")
+            if len(indexes) == 1:
+                return []
+                
+        # Send the rest individually so one bad embed doesn't drop the whole batch
+        sent = []
+        for index in indexes:
+            try:
+                await channel.send(embed=embeds[index])
+                sent.append(index)
+            except discord.HTTPException as e:
+                print(f"❌ Failed to send notification: {e}")
+        return sent
+        
     def create_video_embed(self, video_data, channel_data, stats):
         """Create rich embed for video notification - optimized for shorts"""
         embed = discord.Embed(
-            title=video_data['title'],
-            url=f"https://youtube.com/watch?v={video_data['video_id']}",
-            description=video_data['description'][:200] + "...",
+            title=video_data.title,
+            url=f"https://youtube.com/watch?v={video_data.video_id}",
+            description=video_data.description[:200] + "...",
             color=discord.Color.red(),
-            timestamp=datetime.fromisoformat(video_data['published_at'])
+            timestamp=video_data.published_at
         )
         
-        embed.set_thumbnail(url=video_data['thumbnail_url'])
+        embed.set_thumbnail(url=video_data.thumbnail_url)
         embed.set_author(
             name=channel_data['title'],
             icon_url=channel_data['thumbnail_url'],
@@ -51,16 +104,16 @@ class YouTubeBot(discord.Client):
         )
         
         # Add short video indicator
-        if video_data.get('is_short', False):
+        if video_data.is_short:
             embed.add_field(name="📱 Video Type", value="YouTube Short", inline=True)
-            embed.add_field(name="⏱️ Duration", value=f"{video_data.get('duration_seconds', 0)}s", inline=True)
+            embed.add_field(name="⏱️ Duration", value=f"{video_data.duration_seconds or 0}s", inline=True)
         else:
             embed.add_field(name="📺 Video Type", value="Regular Video", inline=True)
-            embed.add_field(name="⏱️ Duration", value=f"{video_data.get('duration_seconds', 0)}s", inline=True)
+            embed.add_field(name="⏱️ Duration", value=f"{video_data.duration_seconds or 0}s", inline=True)
         
-        embed.add_field(name="👁️ Views", value=f"{video_data['view_count']:,}", inline=True)
-        embed.add_field(name="👍 Likes", value=f"{video_data['like_count']:,}", inline=True)
-        embed.add_field(name="💬 Comments", value=f"{video_data['comment_count']:,}", inline=True)
+        embed.add_field(name="👁️ Views", value=f"{video_data.view_count:,}", inline=True)
+        embed.add_field(name="👍 Likes", value=f"{video_data.like_count:,}", inline=True)
+        embed.add_field(name="💬 Comments", value=f"{video_data.comment_count:,}", inline=True)
         
         embed.add_field(
             name="📊 Performance",
@@ -69,15 +122,15 @@ class YouTubeBot(discord.Client):
             inline=False
         )
         
-        if video_data.get('transcript_preview'):
+        if video_data.transcript_preview:
             embed.add_field(
                 name="📝 Transcript Preview",
-                value=video_data['transcript_preview'][:500] + "...",
+                value=video_data.transcript_preview[:500] + "...",
                 inline=False
             )
         
         # Custom footer for shorts
-        if video_data.get('is_short', False):
+        if video_data.is_short:
             embed.set_footer(text="🔥 High-performing SHORT video detected!")
         else:
             embed.set_footer(text="High-performing video detected!")
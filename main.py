@@ -1,16 +1,25 @@
 import asyncio
-import schedule
-import threading
+import contextvars
+import re
 import time
 from datetime import datetime, timedelta, timezone
 import logging
+from functools import wraps
 import discord
 from discord import app_commands
+from sqlalchemy import case, delete, event, func, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import defer, load_only
 from config import Config
-from database import SessionLocal, Channel, Video
+from database import engine, SessionLocal, Channel, Video, upgrade_schema
 from youtube_monitor import YouTubeMonitor
 from analytics import VideoAnalytics
-from discord_bot import YouTubeBot
+from discord_bot import VideoDTO, YouTubeBot
+
+try:
+    import uvloop
+except ImportError:  # uvloop isn't available on Windows
+    uvloop = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,12 +27,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# YouTube channel URL formats: /channel/<id>, /c/<name>, /user/<name>, /@<handle>
+CHANNEL_URL_RE = re.compile(r'youtube\.com/(?:channel/|c/|user/|@)([a-zA-Z0-9_-]+)', re.ASCII)
+
+# Dialects whose INSERT supports ON CONFLICT, keyed by dialect name
+UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+def chunks(items, size):
+    """Yield successive slices of at most size items"""
+    return (items[i:i + size] for i in range(0, len(items), size))
+
+# SQL statements run on behalf of the current slash command; asyncio.to_thread
+# copies the context, so queries made in worker threads are counted too
+command_query_count = contextvars.ContextVar('command_query_count', default=None)
+
+@event.listens_for(engine, 'before_cursor_execute')
+def _count_command_query(*args):
+    counter = command_query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+def deferred(func):
+    """Defer the interaction before running a slash command and log how long it took"""
+    @wraps(func)
+    async def wrapper(interaction, *args, **kwargs):
+        started = time.perf_counter()
+        counter = [0]
+        token = command_query_count.set(counter)
+        await interaction.response.defer()
+        try:
+            return await func(interaction, *args, **kwargs)
+        finally:
+            command_query_count.reset(token)
+            logger.info(f"⏱️ /{func.__name__}: total={(time.perf_counter() - started) * 1000:.0f}ms queries={counter[0]}")
+            if counter[0] > Config.COMMAND_QUERY_WARNING_THRESHOLD:
+                logger.warning(f"/{func.__name__} ran {counter[0]} queries - possible N+1")
+    return wrapper
+
 class YouTubeMonitoringSystem:
     def __init__(self):
         self.youtube_monitor = YouTubeMonitor()
         self.analytics = VideoAnalytics()
         self.discord_bot = None
         self.monitoring_active = True
+        self.stop_event = asyncio.Event()
+        self.manual_check_task = None
+        self.monitoring_task = None
+        self.channel_data_cache = {}
+        self.cycle_now = None
+        self.cycle_cutoff = None
+        self.cycle_video_stats = {}
+        self.cycle_prefetched_ids = set()
+        self._totals_cache = None
+        self.channel_index = {}
+        self._embed_cache = {}
+        
+        # Bound concurrent channel checks; YouTubeMonitor gives each worker thread its
+        # own session and HTTP connection, so their API calls run in parallel
+        self.channel_semaphore = asyncio.Semaphore(Config.CHANNEL_CHECK_CONCURRENCY)
         
     async def initialize_discord_bot(self):
         """Initialize and start Discord bot"""
@@ -31,85 +92,49 @@ class YouTubeMonitoringSystem:
         
         # Add slash commands
         @self.discord_bot.tree.command(name="listchannels", description="List all monitored channels")
+        @deferred
         async def listchannels(interaction: discord.Interaction):
             """List all monitored channels"""
-            await interaction.response.defer()
-            
-            db = SessionLocal()
-            channels = db.query(Channel).filter_by(is_active=True).all()
-            db.close()
+            channels = await asyncio.to_thread(self._query_active_channels)
             
             if not channels:
                 await interaction.followup.send("No channels being monitored!")
                 return
                 
-            embed = discord.Embed(title="Monitored Channels", color=discord.Color.blue())
-            
-            # Limit to first 20 channels to avoid Discord's 25 field limit
-            for i, channel in enumerate(channels[:20]):
-                embed.add_field(
-                    name=f"{i+1}. {channel.title}",
-                    value=f"Subscribers: {channel.subscriber_count:,}\nVideos: {channel.video_count}",
-                    inline=True
-                )
-            
-            # Add summary if there are more channels
-            if len(channels) > 20:
-                embed.add_field(
-                    name="📊 Summary",
-                    value=f"Showing 20 of {len(channels)} channels\nUse `/listshorts` to see recent shorts",
-                    inline=False
-                )
-            
+            embed = self._build_channel_list_embed(channels)
             await interaction.followup.send(embed=embed)
             
         @self.discord_bot.tree.command(name="listshorts", description="List recent short videos")
+        @deferred
         async def listshorts(interaction: discord.Interaction, channel_name: str = None):
             """List recent short videos from monitored channels"""
-            await interaction.response.defer()
-            
-            db = SessionLocal()
+            # Fetch one extra across all channels to detect truncation
+            channel, videos = await asyncio.to_thread(
+                self._query_recent_shorts, channel_name, 10 if channel_name else 16
+            )
             
             if channel_name:
-                # List shorts from specific channel
-                channel = db.query(Channel).filter(
-                    Channel.title.ilike(f"%{channel_name}%")
-                ).first()
                 if not channel:
                     await interaction.followup.send(f"Channel '{channel_name}' not found!")
                     return
                     
-                videos = db.query(Video).filter(
-                    Video.channel_id == channel.channel_id,
-                    Video.is_short == True
-                ).order_by(Video.published_at.desc()).limit(10).all()
-                
                 embed = discord.Embed(
                     title=f"Recent Shorts from {channel.title}",
                     color=discord.Color.green()
                 )
             else:
-                # List shorts from all channels
-                videos = db.query(Video).filter(
-                    Video.is_short == True
-                ).order_by(Video.published_at.desc()).limit(15).all()
-                
                 embed = discord.Embed(
                     title="Recent Shorts from All Channels",
                     color=discord.Color.green()
                 )
             
-            db.close()
-            
             if not videos:
                 await interaction.followup.send("No short videos found!")
                 return
                 
             # Limit to first 15 videos to avoid Discord's 25 field limit
-            for i, video in enumerate(videos[:15]):
-                # Get channel info
-                channel = db.query(Channel).filter_by(channel_id=video.channel_id).first()
-                channel_name = channel.title if channel else "Unknown Channel"
+            for i, (video, channel_title) in enumerate(videos[:15]):
+                channel_name = channel_title or "Unknown Channel"
                 
                 embed.add_field(
                     name=f"📱 {i+1}. {video.title[:40]}...",
@@ -124,74 +149,28 @@ class YouTubeMonitoringSystem:
             if len(videos) > 15:
                 embed.add_field(
                     name="📊 Summary",
-                    value=f"Showing 15 of {len(videos)} recent shorts",
+                    value="Showing the 15 most recent shorts",
                     inline=False
                 )
                 
             await interaction.followup.send(embed=embed)
             
         @self.discord_bot.tree.command(name="stats", description="Show bot statistics")
+        @deferred
         async def stats(interaction: discord.Interaction):
             """Show bot statistics"""
-            await interaction.response.defer()
-            
-            # Show overall stats
-            db = SessionLocal()
-            total_channels = db.query(Channel).filter_by(is_active=True).count()
-            total_shorts = db.query(Video).filter(Video.is_short == True).count()
-            total_videos = db.query(Video).count()
-            db.close()
-            
-            # Get quota status for all keys
-            quota_status = self.youtube_monitor.get_quota_status()
-            
-            embed = discord.Embed(title="Bot Statistics", color=discord.Color.green())
-            embed.add_field(name="Monitored Channels", value=total_channels, inline=True)
-            embed.add_field(name="Total Videos", value=total_videos, inline=True)
-            embed.add_field(name="Short Videos", value=total_shorts, inline=True)
-            
-            # Show quota for each API key
-            total_used = sum(key['quota_used'] for key in quota_status)
-            total_available = len(quota_status) * Config.DAILY_QUOTA_LIMIT
-            
-            embed.add_field(
-                name="Total Quota", 
-                value=f"{total_used:,} / {total_available:,} ({(total_used/total_available*100):.1f}%)", 
-                inline=True
-            )
-            
-            # Individual key status
-            key_status_text = []
-            for key in quota_status:
-                status = "✅" if key['is_active'] and key['quota_remaining'] > 1000 else "⚠️" if key['quota_remaining'] > 0 else "❌"
-                key_status_text.append(
-                    f"{status} Key {key['index']} (*{key['identifier']}): "
-                    f"{key['quota_used']:,}/{Config.DAILY_QUOTA_LIMIT:,}"
-                )
-            
-            embed.add_field(
-                name="API Keys Status", 
-                value="\n".join(key_status_text), 
-                inline=False
-            )
-            
+            embed = await self._build_stats_embed()
             await interaction.followup.send(embed=embed)
             
         @self.discord_bot.tree.command(name="channelaverage", description="Show channel average views from recent videos")
+        @deferred
         async def channelaverage(interaction: discord.Interaction, channel_name: str):
             """Show average views from last 25 videos of a channel"""
-            await interaction.response.defer()
-            
-            db = SessionLocal()
-            
             # Find channel by name
-            channel = db.query(Channel).filter(
-                Channel.title.ilike(f"%{channel_name}%")
-            ).first()
+            channel = self._find_channel(channel_name)
             
             if not channel:
                 await interaction.followup.send(f"Channel '{channel_name}' not found!")
-                db.close()
                 return
                 
             # Get performance summary
@@ -199,7 +178,6 @@ class YouTubeMonitoringSystem:
             
             if not summary:
                 await interaction.followup.send(f"No videos found for channel '{channel.title}'!")
-                db.close()
                 return
                 
             embed = discord.Embed(
@@ -240,83 +218,45 @@ class YouTubeMonitoringSystem:
             )
             
             await interaction.followup.send(embed=embed)
-            db.close()
             
         @self.discord_bot.tree.command(name="apistatus", description="Show detailed API key status")
+        @deferred
         async def apistatus(interaction: discord.Interaction):
             """Show detailed API key status"""
-            await interaction.response.defer()
-            
-            quota_status = self.youtube_monitor.get_quota_status()
-            
-            embed = discord.Embed(title="API Key Detailed Status", color=discord.Color.blue())
-            
-            for key in quota_status:
-                # Determine health color
-                if not key['is_active']:
-                    color = "🔴"
-                elif key['quota_remaining'] < 500:
-                    color = "🟡"  
-                else:
-                    color = "🟢"
-                    
-                # Format last used time
-                last_used = "Never" if not key['last_used'] else key['last_used'].strftime("%H:%M UTC")
-                
-                embed.add_field(
-                    name=f"{color} API Key {key['index']} (*{key['identifier']})",
-                    value=f"**Quota**: {key['quota_used']:,} / 10,000\n"
-                          f"**Remaining**: {key['quota_remaining']:,}\n"
-                          f"**Last Used**: {last_used}\n"
-                          f"**Errors**: {key['error_count']}",
-                    inline=True
-                )
-                
-            # Add current active key
-            embed.add_field(
-                name="Currently Active",
-                value=f"Using API Key {self.youtube_monitor.current_key_index}",
-                inline=False
-            )
-            
+            embed = await self._build_api_status_embed()
             await interaction.followup.send(embed=embed)
             
         @self.discord_bot.tree.command(name="checknow", description="Manually trigger channel check")
+        @deferred
         async def checknow(interaction: discord.Interaction):
             """Manually trigger channel check"""
-            await interaction.response.defer()
-            
             await interaction.followup.send("Starting manual check of all channels for SHORTS...")
-            await self.check_all_channels()
-            await interaction.followup.send("Manual check completed!")
+            
+            # Run the check in the background so the interaction isn't held open;
+            # the followup webhook stays valid for reporting completion. A fresh context
+            # keeps the cycle's queries out of this command's query count
+            self.manual_check_task = asyncio.create_task(
+                self._run_check_and_notify(interaction.followup), context=contextvars.Context()
+            )
             
         @self.discord_bot.tree.command(name="topchannel", description="Show top performing videos for a specific channel")
+        @deferred
         async def topchannel(interaction: discord.Interaction, channel_handle: str, timeframe: str = "all", count: int = 10):
             """Show top performing videos for a specific channel"""
-            await interaction.response.defer()
-            
-            db = SessionLocal()
-            
             # Find channel by handle or name
-            channel = db.query(Channel).filter(
-                (Channel.title.ilike(f"%{channel_handle}%")) |
-                (Channel.channel_id.ilike(f"%{channel_handle}%"))
-            ).first()
+            channel = self._find_channel(channel_handle, match_id=True)
             
             if not channel:
                 await interaction.followup.send(f"Channel '{channel_handle}' not found!")
-                db.close()
                 return
                 
+            # One timestamp for the cutoff and every video age below
+            now = datetime.now(timezone.utc)
+            
             # Handle different timeframe options
             if timeframe.lower() == "all":
                 # Get all SHORT videos for this channel (no time filter)
-                videos = db.query(Video).filter(
-                    Video.channel_id == channel.channel_id,
-                    Video.is_short == True
-                ).order_by(Video.view_count.desc()).limit(count).all()
-                title = f"🔥 Top Shorts - {channel.title} (All Time)"
-                description = f"{len(videos)} shorts found"
+                cutoff_time = None
             else:
                 try:
                     # Parse timeframe - support both hours and days
@@ -325,34 +265,31 @@ class YouTubeMonitoringSystem:
                     if timeframe_lower.endswith('d') or timeframe_lower.endswith('days'):
                         # Days format: "7d", "3days", etc.
                         days = int(timeframe_lower.replace('d', '').replace('days', ''))
-                        cutoff_time = datetime.now(timezone.utc) - timedelta(days=days)
+                        cutoff_time = now - timedelta(days=days)
                         time_str = f"{days} days"
                     elif timeframe_lower.endswith('h') or timeframe_lower.endswith('hours'):
                         # Hours format: "24h", "48hours", etc.
                         hours = int(timeframe_lower.replace('h', '').replace('hours', ''))
-                        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+                        cutoff_time = now - timedelta(hours=hours)
                         time_str = f"{hours} hours"
                     else:
                         # Default: assume hours if no suffix
                         hours = int(timeframe)
-                        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+                        cutoff_time = now - timedelta(hours=hours)
                         time_str = f"{hours} hours"
-                    
-                    videos = db.query(Video).filter(
-                        Video.channel_id == channel.channel_id,
-                        Video.published_at >= cutoff_time,
-                        Video.is_short == True
-                    ).order_by(Video.view_count.desc()).limit(count).all()
-                    
-                    title = f"🔥 Top Shorts - {channel.title}"
-                    description = f"Last {time_str} | {len(videos)} shorts found"
-                    
+                        
                 except ValueError:
                     await interaction.followup.send("❌ Invalid timeframe! Use: all, 24, 48, 72, 7d, 3days, 24h, 48hours, etc. Count parameter controls number of results.")
-                    db.close()
                     return
+                    
+            videos = await asyncio.to_thread(self._query_top_shorts, cutoff_time, count, channel.channel_id)
             
-            db.close()
+            if cutoff_time is None:
+                title = f"🔥 Top Shorts - {channel.title} (All Time)"
+                description = f"{len(videos)} shorts found"
+            else:
+                title = f"🔥 Top Shorts - {channel.title}"
+                description = f"Last {time_str} | {len(videos)} shorts found"
             
             if not videos:
                 embed = discord.Embed(
@@ -369,14 +306,14 @@ class YouTubeMonitoringSystem:
                 color=discord.Color.red()
             )
             
-            for i, video in enumerate(videos):
+            for i, (video, _) in enumerate(videos):
                 # Ensure published_at is timezone-aware
                 if video.published_at.tzinfo is None:
                     published_at = video.published_at.replace(tzinfo=timezone.utc)
                 else:
                     published_at = video.published_at
                 
-                hours_old = (datetime.now(timezone.utc) - published_at).total_seconds() / 3600
+                hours_old = (now - published_at).total_seconds() / 3600
                 views_per_hour = video.view_count / max(hours_old, 1)
                 
                 embed.add_field(
@@ -392,20 +329,16 @@ class YouTubeMonitoringSystem:
             await interaction.followup.send(embed=embed)
             
         @self.discord_bot.tree.command(name="top", description="Show top performing videos across all channels")
+        @deferred
         async def top(interaction: discord.Interaction, timeframe: str = "all", count: int = 15):
             """Show top performing videos across all channels"""
-            await interaction.response.defer()
-            
-            db = SessionLocal()
+            # One timestamp for the cutoff and every video age below
+            now = datetime.now(timezone.utc)
             
             # Handle different timeframe options
             if timeframe.lower() == "all":
                 # Get all SHORT videos (no time filter)
-                videos = db.query(Video).filter(
-                    Video.is_short == True
-                ).order_by(Video.view_count.desc()).limit(count).all()
-                title = "🏆 Top Performing Shorts (All Time)"
-                description = f"{len(videos)} shorts found"
+                cutoff_time = None
             else:
                 try:
                     # Parse timeframe - support both hours and days
@@ -414,32 +347,32 @@ class YouTubeMonitoringSystem:
                     if timeframe_lower.endswith('d') or timeframe_lower.endswith('days'):
                         # Days format: "7d", "3days", etc.
                         days = int(timeframe_lower.replace('d', '').replace('days', ''))
-                        cutoff_time = datetime.now(timezone.utc) - timedelta(days=days)
+                        cutoff_time = now - timedelta(days=days)
                         time_str = f"{days} days"
                     elif timeframe_lower.endswith('h') or timeframe_lower.endswith('hours'):
                         # Hours format: "24h", "48hours", etc.
                         hours = int(timeframe_lower.replace('h', '').replace('hours', ''))
-                        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+                        cutoff_time = now - timedelta(hours=hours)
                         time_str = f"{hours} hours"
                     else:
                         # Default: assume hours if no suffix
                         hours = int(timeframe)
-                        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+                        cutoff_time = now - timedelta(hours=hours)
                         time_str = f"{hours} hours"
-                    
-                    videos = db.query(Video).filter(
-                        Video.published_at >= cutoff_time,
-                        Video.is_short == True
-                    ).order_by(Video.view_count.desc()).limit(count).all()
-                    
-                    title = f"🏆 Top Performing Shorts"
-                    description = f"Last {time_str} | {len(videos)} shorts found"
-                    
+                        
                 except ValueError:
                     await interaction.followup.send("❌ Invalid timeframe! Use: all, 24, 48, 72, 7d, 3days, 24h, 48hours, etc. Count parameter controls number of results.")
-                    db.close()
                     return
+                    
+            videos = await asyncio.to_thread(self._query_top_shorts, cutoff_time, count)
             
+            if cutoff_time is None:
+                title = "🏆 Top Performing Shorts (All Time)"
+                description = f"{len(videos)} shorts found"
+            else:
+                title = f"🏆 Top Performing Shorts"
+                description = f"Last {time_str} | {len(videos)} shorts found"
+                
             if not videos:
                 embed = discord.Embed(
                     title="No Shorts Found",
@@ -447,7 +380,6 @@ class YouTubeMonitoringSystem:
                     color=discord.Color.orange()
                 )
                 await interaction.followup.send(embed=embed)
-                db.close()
                 return
                 
             embed = discord.Embed(
@@ -456,10 +388,8 @@ class YouTubeMonitoringSystem:
                 color=discord.Color.gold()
             )
             
-            for i, video in enumerate(videos):
-                # Get channel info
-                channel = db.query(Channel).filter_by(channel_id=video.channel_id).first()
-                channel_name = channel.title if channel else "Unknown Channel"
+            for i, (video, channel_title) in enumerate(videos):
+                channel_name = channel_title or "Unknown Channel"
                 
                 # Ensure published_at is timezone-aware
                 if video.published_at.tzinfo is None:
@@ -467,7 +397,7 @@ class YouTubeMonitoringSystem:
                 else:
                     published_at = video.published_at
                 
-                hours_old = (datetime.now(timezone.utc) - published_at).total_seconds() / 3600
+                hours_old = (now - published_at).total_seconds() / 3600
                 views_per_hour = video.view_count / max(hours_old, 1)
                 
                 embed.add_field(
@@ -480,14 +410,12 @@ class YouTubeMonitoringSystem:
                     inline=False
                 )
                 
-            db.close()
             await interaction.followup.send(embed=embed)
             
         @self.discord_bot.tree.command(name="addchannel", description="Add channel(s) to monitor")
+        @deferred
         async def addchannel(interaction: discord.Interaction, identifiers: str):
             """Add one or more channels to monitor using handles, URLs, or channel IDs (comma-separated)"""
-            await interaction.response.defer()
-            
             # Split by comma and clean up whitespace
             channel_list = [id.strip() for id in identifiers.split(',')]
             
@@ -516,32 +444,23 @@ class YouTubeMonitoringSystem:
                         # If it's a handle (not a channel ID), search for the channel
                         if not target_channel_id.startswith('UC'):
                             # Search for channel by handle
-                            channel_info = self.youtube_monitor.search_channel_by_handle(target_channel_id)
+                            channel_info = await self._run_monitor_call(self.youtube_monitor.search_channel_by_handle, target_channel_id)
                             if not channel_info:
                                 failed_channels.append(f"{identifier} (not found)")
                                 continue
                             target_channel_id = channel_info['channel_id']
                     
                     # Fetch channel info directly
-                    channel_info = self.youtube_monitor.get_channel_info(target_channel_id)
+                    channel_info = await self._run_monitor_call(self.youtube_monitor.get_channel_info, target_channel_id)
                     if not channel_info:
                         failed_channels.append(f"{identifier} (could not fetch info)")
                         continue
                         
-                    # Check if channel already exists
-                    db = SessionLocal()
-                    existing_channel = db.query(Channel).filter_by(channel_id=target_channel_id).first()
-                    if existing_channel:
+                    # Add to database unless the channel already exists
+                    if not await asyncio.to_thread(self._add_channel, channel_info):
                         failed_channels.append(f"{channel_info['title']} (already exists)")
-                        db.close()
                         continue
                     
-                    # Add to database
-                    channel = Channel(**channel_info)
-                    db.add(channel)
-                    db.commit()
-                    db.close()
-                    
                     added_channels.append({
                         'title': channel_info['title'],
                         'subscribers': channel_info['subscriber_count'],
@@ -551,7 +470,8 @@ class YouTubeMonitoringSystem:
                 except Exception as e:
                     failed_channels.append(f"{identifier} (error: {str(e)})")
             
-            # Create response embed
+            # Build response embeds and send them in a single message
+            embeds = []
             if added_channels:
                 embed = discord.Embed(
                     title="✅ Channels Added",
@@ -574,9 +494,9 @@ class YouTubeMonitoringSystem:
                         inline=False
                     )
                 
-                await interaction.followup.send(embed=embed)
+                embeds.append(embed)
             
-            # Send separate message for failed channels if any
+            # Failed channels go in a second embed of the same message
             if failed_channels:
                 failed_embed = discord.Embed(
                     title="❌ Failed to Add",
@@ -599,32 +519,23 @@ class YouTubeMonitoringSystem:
                         inline=False
                     )
                 
-                await interaction.followup.send(embed=failed_embed)
+                embeds.append(failed_embed)
             
-            if not added_channels and not failed_channels:
+            if embeds:
+                await interaction.followup.send(embeds=embeds)
+            else:
                 await interaction.followup.send("No valid channel identifiers provided!")
             
         @self.discord_bot.tree.command(name="removechannel", description="Remove a channel from monitoring")
+        @deferred
         async def removechannel(interaction: discord.Interaction, handle: str):
             """Remove a channel from monitoring"""
-            await interaction.response.defer()
-            
-            db = SessionLocal()
-            
-            # Find channel by handle or name
-            channel = db.query(Channel).filter(
-                (Channel.title.ilike(f"%{handle}%")) |
-                (Channel.channel_id.ilike(f"%{handle}%"))
-            ).first()
+            # Find channel by handle or name and delete it
+            channel_name = await asyncio.to_thread(self._remove_channel, handle)
             
-            if not channel:
+            if not channel_name:
                 await interaction.followup.send(f"Channel '{handle}' not found!")
                 return
-                
-            channel_name = channel.title
-            db.delete(channel)
-            db.commit()
-            db.close()
             
             embed = discord.Embed(
                 title="❌ Channel Removed",
@@ -634,104 +545,74 @@ class YouTubeMonitoringSystem:
             
             await interaction.followup.send(embed=embed)
             
-        # Add prefix commands using message events
-        @self.discord_bot.event
-        async def on_message(message):
-            if message.author == self.discord_bot.user:
+        # Add prefix commands, dispatched from message events
+        async def add_channel_command(message):
+            """Add a channel to monitor from a YouTube URL"""
+            # Extract channel URL from message
+            parts = message.content.split()
+            if len(parts) < 2:
+                await message.channel.send("Usage: !add_channel <youtube_url>")
                 return
                 
-            if message.content.startswith('!add_channel'):
-                # Extract channel URL from message
-                parts = message.content.split()
-                if len(parts) < 2:
-                    await message.channel.send("Usage: !add_channel <youtube_url>")
-                    return
-                    
-                channel_url = parts[1]
-                channel_id = self._extract_channel_id(channel_url)
-                if not channel_id:
-                    await message.channel.send("Invalid YouTube channel URL!")
-                    return
-                    
-                # Fetch channel info
-                channel_info = self.youtube_monitor.get_channel_info(channel_id)
-                if not channel_info:
-                    await message.channel.send("Could not fetch channel information!")
-                    return
-                    
-                # Add to database
-                db = SessionLocal()
-                channel = Channel(**channel_info)
-                db.merge(channel)
-                db.commit()
-                db.close()
+            channel_url = parts[1]
+            channel_id = self._extract_channel_id(channel_url)
+            if not channel_id:
+                await message.channel.send("Invalid YouTube channel URL!")
+                return
                 
-                await message.channel.send(f"Added channel: **{channel_info['title']}** to monitoring list!")
+            # Fetch channel info
+            channel_info = await self._run_monitor_call(self.youtube_monitor.get_channel_info, channel_id)
+            if not channel_info:
+                await message.channel.send("Could not fetch channel information!")
+                return
                 
-            elif message.content.startswith('!list_channels'):
-                db = SessionLocal()
-                channels = db.query(Channel).filter_by(is_active=True).all()
-                db.close()
+            # Add to database
+            await asyncio.to_thread(self._merge_channel, channel_info)
+            
+            await message.channel.send(f"Added channel: **{channel_info['title']}** to monitoring list!")
+            
+        async def list_channels_command(message):
+            """List all monitored channels"""
+            channels = await asyncio.to_thread(self._query_active_channels)
+            
+            if not channels:
+                await message.channel.send("No channels being monitored!")
+                return
                 
-                if not channels:
-                    await message.channel.send("No channels being monitored!")
+            embed = self._build_channel_list_embed(channels)
+            await message.channel.send(embed=embed)
+            
+        async def list_shorts_command(message):
+            """List recent short videos, optionally for one channel"""
+            # Extract channel name if provided
+            parts = message.content.split()
+            channel_name = parts[1] if len(parts) > 1 else None
+            
+            channel, videos = await asyncio.to_thread(
+                self._query_recent_shorts, channel_name, 10 if channel_name else 15
+            )
+            
+            if channel_name:
+                if not channel:
+                    await message.channel.send(f"Channel '{channel_name}' not found!")
                     return
-                    
-                embed = discord.Embed(title="Monitored Channels", color=discord.Color.blue())
-                for channel in channels:
-                    embed.add_field(
-                        name=channel.title,
-                        value=f"Subscribers: {channel.subscriber_count:,}\nVideos: {channel.video_count}",
-                        inline=True
-                    )
-                await message.channel.send(embed=embed)
-                
-            elif message.content.startswith('!list_shorts'):
-                # Extract channel name if provided
-                parts = message.content.split()
-                channel_name = parts[1] if len(parts) > 1 else None
-                
-                db = SessionLocal()
-                
-                if channel_name:
-                    # List shorts from specific channel
-                    channel = db.query(Channel).filter(
-                        Channel.title.ilike(f"%{channel_name}%")
-                    ).first()
-                    if not channel:
-                        await message.channel.send(f"Channel '{channel_name}' not found!")
-                        return
-                        
-                    videos = db.query(Video).filter(
-                        Video.channel_id == channel.channel_id,
-                        Video.is_short == True
-                    ).order_by(Video.published_at.desc()).limit(10).all()
-                    
-                    embed = discord.Embed(
-                        title=f"Recent Shorts from {channel.title}",
-                        color=discord.Color.green()
-                    )
-                else:
-                    # List shorts from all channels
-                    videos = db.query(Video).filter(
-                        Video.is_short == True
-                    ).order_by(Video.published_at.desc()).limit(15).all()
-                    
-                    embed = discord.Embed(
-                        title="Recent Shorts from All Channels",
-                        color=discord.Color.green()
-                    )
-                
-                db.close()
+                title = f"Recent Shorts from {channel.title}"
+            else:
+                title = "Recent Shorts from All Channels"
+            
+            if not videos:
+                await message.channel.send("No short videos found!")
+                return
                 
-                if not videos:
-                    await message.channel.send("No short videos found!")
-                    return
-                    
-                for video in videos:
-                    # Get channel info
-                    channel = db.query(Channel).filter_by(channel_id=video.channel_id).first()
-                    channel_name = channel.title if channel else "Unknown Channel"
+            # Split into embeds of up to 10 fields, all sent in one message
+            embeds = []
+            for video_chunk in chunks(videos, 10):
+                embed = discord.Embed(
+                    title=title if not embeds else None,
+                    color=discord.Color.green()
+                )
+                for video, channel_title in video_chunk:
+                    channel_name = channel_title or "Unknown Channel"
                     
                     embed.add_field(
                         name=f"📱 {video.title[:50]}...",
@@ -741,136 +622,205 @@ class YouTubeMonitoringSystem:
                               f"**Published**: {video.published_at.strftime('%Y-%m-%d %H:%M')}",
                         inline=False
                     )
-                    
-                await message.channel.send(embed=embed)
-                
-            elif message.content.startswith('!check_now'):
-                await message.channel.send("Starting manual check of all channels for SHORTS...")
-                await self.check_all_channels()
-                await message.channel.send("Manual check completed!")
-                
-            elif message.content.startswith('!rotate_key'):
-                current_key = self.youtube_monitor.current_key_index
-                if self.youtube_monitor._rotate_api_key(force=True):
-                    new_key = self.youtube_monitor.current_key_index
-                    await message.channel.send(f"Rotated from API key {current_key} to key {new_key}")
-                else:
-                    await message.channel.send("Failed to rotate API key - all keys may be exhausted!")
-                    
-            elif message.content.startswith('!quota_reset'):
-                now = datetime.now(timezone.utc)
-                reset_time = now.replace(hour=0, minute=0, second=0) + timedelta(days=1)
-                time_until_reset = reset_time - now
-                
-                hours = int(time_until_reset.total_seconds() // 3600)
-                minutes = int((time_until_reset.total_seconds() % 3600) // 60)
-                
-                await message.channel.send(f"Quota resets in {hours}h {minutes}m (at midnight UTC)")
-                
-            elif message.content.startswith('!api_status'):
-                quota_status = self.youtube_monitor.get_quota_status()
-                
-                embed = discord.Embed(title="API Key Detailed Status", color=discord.Color.blue())
-                
-                for key in quota_status:
-                    # Determine health color
-                    if not key['is_active']:
-                        color = "🔴"
-                    elif key['quota_remaining'] < 500:
-                        color = "🟡"  
-                    else:
-                        color = "🟢"
-                        
-                    # Format last used time
-                    last_used = "Never" if not key['last_used'] else key['last_used'].strftime("%H:%M UTC")
-                    
-                    embed.add_field(
-                        name=f"{color} API Key {key['index']} (*{key['identifier']})",
-                        value=f"**Quota**: {key['quota_used']:,} / 10,000\n"
-                              f"**Remaining**: {key['quota_remaining']:,}\n"
-                              f"**Last Used**: {last_used}\n"
-                              f"**Errors**: {key['error_count']}",
-                        inline=True
-                    )
-                    
-                # Add current active key
-                embed.add_field(
-                    name="Currently Active",
-                    value=f"Using API Key {self.youtube_monitor.current_key_index}",
-                    inline=False
-                )
-                
-                await message.channel.send(embed=embed)
-                
-            elif message.content.startswith('!stats'):
-                # Show overall stats
-                db = SessionLocal()
-                total_channels = db.query(Channel).filter_by(is_active=True).count()
-                total_shorts = db.query(Video).filter(Video.is_short == True).count()
-                total_videos = db.query(Video).count()
-                db.close()
-                
-                # Get quota status for all keys
-                quota_status = self.youtube_monitor.get_quota_status()
-                
-                embed = discord.Embed(title="Bot Statistics", color=discord.Color.green())
-                embed.add_field(name="Monitored Channels", value=total_channels, inline=True)
-                embed.add_field(name="Total Videos", value=total_videos, inline=True)
-                embed.add_field(name="Short Videos", value=total_shorts, inline=True)
-                
-                # Show quota for each API key
-                total_used = sum(key['quota_used'] for key in quota_status)
-                total_available = len(quota_status) * Config.DAILY_QUOTA_LIMIT
-                
-                embed.add_field(
-                    name="Total Quota", 
-                    value=f"{total_used:,} / {total_available:,} ({(total_used/total_available*100):.1f}%)", 
-                    inline=True
-                )
-                
-                # Individual key status
-                key_status_text = []
-                for key in quota_status:
-                    status = "✅" if key['is_active'] and key['quota_remaining'] > 1000 else "⚠️" if key['quota_remaining'] > 0 else "❌"
-                    key_status_text.append(
-                        f"{status} Key {key['index']} (*{key['identifier']}): "
-                        f"{key['quota_used']:,}/{Config.DAILY_QUOTA_LIMIT:,}"
-                    )
+                embeds.append(embed)
                 
-                embed.add_field(
-                    name="API Keys Status", 
-                    value="\n".join(key_status_text), 
-                    inline=False
-                )
+            await message.channel.send(embeds=embeds)
+            
+        async def check_now_command(message):
+            """Manually trigger channel check"""
+            await message.channel.send("Starting manual check of all channels for SHORTS...")
+            await self.check_all_channels()
+            await message.channel.send("Manual check completed!")
+            
+        async def rotate_key_command(message):
+            """Switch to the next available API key"""
+            current_key = self.youtube_monitor.current_key_index
+            if await self._run_monitor_call(self.youtube_monitor._rotate_api_key, True):
+                new_key = self.youtube_monitor.current_key_index
+                await message.channel.send(f"Rotated from API key {current_key} to key {new_key}")
+            else:
+                await message.channel.send("Failed to rotate API key - all keys may be exhausted!")
+            
+        async def quota_reset_command(message):
+            """Show time until the daily quota resets"""
+            now = datetime.now(timezone.utc)
+            reset_time = now.replace(hour=0, minute=0, second=0) + timedelta(days=1)
+            time_until_reset = reset_time - now
+            
+            hours = int(time_until_reset.total_seconds() // 3600)
+            minutes = int((time_until_reset.total_seconds() % 3600) // 60)
+            
+            await message.channel.send(f"Quota resets in {hours}h {minutes}m (at midnight UTC)")
+            
+        async def api_status_command(message):
+            """Show detailed API key status"""
+            embed = await self._build_api_status_embed()
+            await message.channel.send(embed=embed)
+            
+        async def stats_command(message):
+            """Show bot statistics"""
+            embed = await self._build_stats_embed()
+            await message.channel.send(embed=embed)
+            
+        prefix_commands = {
+            '!add_channel': add_channel_command,
+            '!list_channels': list_channels_command,
+            '!list_shorts': list_shorts_command,
+            '!check_now': check_now_command,
+            '!rotate_key': rotate_key_command,
+            '!quota_reset': quota_reset_command,
+            '!api_status': api_status_command,
+            '!stats': stats_command,
+        }
+        
+        @self.discord_bot.event
+        async def on_message(message):
+            # Ignore bots (including ourselves) and anything that can't be a command
+            if message.author.bot or not message.content.startswith('!'):
+                return
                 
-                await message.channel.send(embed=embed)
+            # Dispatch on the first word so each command costs a single dict lookup
+            handler = prefix_commands.get(message.content.split(maxsplit=1)[0])
+            if handler:
+                await handler(message)
                 
-    def _extract_channel_id(self, url):
-        """Extract channel ID from various YouTube URL formats"""
-        import re
+    def _build_channel_list_embed(self, channels):
+        """Build the monitored channels embed"""
+        embed = discord.Embed(title="Monitored Channels", color=discord.Color.blue())
+        
+        # Limit to first 20 channels to avoid Discord's 25 field limit
+        for i, channel in enumerate(channels[:20]):
+            embed.add_field(
+                name=f"{i+1}. {channel.title}",
+                value=f"Subscribers: {channel.subscriber_count:,}\nVideos: {channel.video_count}",
+                inline=True
+            )
+        
+        # Add summary if there are more channels
+        if len(channels) > 20:
+            embed.add_field(
+                name="📊 Summary",
+                value=f"Showing 20 of {len(channels)} channels\nUse `/listshorts` to see recent shorts",
+                inline=False
+            )
+        
+        return embed
         
-        # Handle different URL patterns
-        patterns = [
-            r'youtube\.com/channel/([a-zA-Z0-9_-]+)',
-            r'youtube\.com/c/([a-zA-Z0-9_-]+)',
-            r'youtube\.com/user/([a-zA-Z0-9_-]+)',
-            r'youtube\.com/@([a-zA-Z0-9_-]+)'
+    async def _build_stats_embed(self):
+        """Build the bot statistics embed"""
+        # Show overall stats
+        total_channels, total_shorts, total_videos = await asyncio.to_thread(self._query_totals)
+        
+        # Get quota status for all keys
+        quota_status = await self._run_monitor_call(self.youtube_monitor.get_quota_status)
+        
+        # Reuse the last embed while nothing it shows has changed
+        signature = (total_channels, total_shorts, total_videos, tuple(
+            (key['index'], key['quota_used'], key['quota_remaining'], key['is_active'])
+            for key in quota_status
+        ))
+        cached = self._embed_cache.get('stats')
+        if cached and cached[0] == signature:
+            return cached[1]
+            
+        embed = discord.Embed(title="Bot Statistics", color=discord.Color.green())
+        embed.add_field(name="Monitored Channels", value=total_channels, inline=True)
+        embed.add_field(name="Total Videos", value=total_videos, inline=True)
+        embed.add_field(name="Short Videos", value=total_shorts, inline=True)
+        
+        # Show quota for each API key
+        limit = Config.DAILY_QUOTA_LIMIT
+        total_used = sum(key['quota_used'] for key in quota_status)
+        total_available = len(quota_status) * limit
+        
+        embed.add_field(
+            name="Total Quota", 
+            value=f"{total_used:,} / {total_available:,} ({(total_used/total_available*100):.1f}%)", 
+            inline=True
+        )
+        
+        # Individual key status
+        key_status_text = [
+            f"{'✅' if key['is_active'] and key['quota_remaining'] > 1000 else '⚠️' if key['quota_remaining'] > 0 else '❌'} "
+            f"Key {key['index']} (*{key['identifier']}): {key['quota_used']:,}/{limit:,}"
+            for key in quota_status
         ]
         
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                identifier = match.group(1)
+        embed.add_field(
+            name="API Keys Status", 
+            value="\n".join(key_status_text), 
+            inline=False
+        )
+        
+        self._embed_cache['stats'] = (signature, embed)
+        return embed
+        
+    async def _build_api_status_embed(self):
+        """Build the detailed API key status embed"""
+        # Surface connection pool usage so leaked sessions show up in the logs
+        logger.info(f"DB pool: {engine.pool.status()}")
+        
+        quota_status = await self._run_monitor_call(self.youtube_monitor.get_quota_status)
+        
+        # Reuse the last embed while nothing it shows has changed
+        signature = (self.youtube_monitor.current_key_index, tuple(
+            (key['index'], key['quota_used'], key['quota_remaining'], key['is_active'],
+             key['last_used'], key['error_count'])
+            for key in quota_status
+        ))
+        cached = self._embed_cache.get('api_status')
+        if cached and cached[0] == signature:
+            return cached[1]
+            
+        embed = discord.Embed(title="API Key Detailed Status", color=discord.Color.blue())
+        
+        for key in quota_status:
+            # Determine health color
+            if not key['is_active']:
+                color = "🔴"
+            elif key['quota_remaining'] < 500:
+                color = "🟡"  
+            else:
+                color = "🟢"
                 
-                # If it's already a channel ID (starts with UC)
-                if identifier.startswith('UC'):
-                    return identifier
-                    
-                # Otherwise, need to resolve it
-                # This would require an additional API call to search
-                # For now, return None for non-direct channel IDs
-                return None
+            # Format last used time
+            last_used = "Never" if not key['last_used'] else key['last_used'].strftime("%H:%M UTC")
+            
+            embed.add_field(
+                name=f"{color} API Key {key['index']} (*{key['identifier']})",
+                value=f"**Quota**: {key['quota_used']:,} / 10,000\n"
+                      f"**Remaining**: {key['quota_remaining']:,}\n"
+                      f"**Last Used**: {last_used}\n"
+                      f"**Errors**: {key['error_count']}",
+                inline=True
+            )
+            
+        # Add current active key
+        embed.add_field(
+            name="Currently Active",
+            value=f"Using API Key {self.youtube_monitor.current_key_index}",
+            inline=False
+        )
+        
+        self._embed_cache['api_status'] = (signature, embed)
+        return embed
+        
+    def _extract_channel_id(self, url):
+        """Extract channel ID from various YouTube URL formats"""
+        # Handle /channel/, /c/, /user/ and /@ URL patterns
+        match = CHANNEL_URL_RE.search(url)
+        if match:
+            identifier = match.group(1)
+            
+            # If it's already a channel ID (starts with UC)
+            if identifier.startswith('UC'):
+                return identifier
                 
+            # Otherwise, need to resolve it
+            # This would require an additional API call to search
+            # For now, return None for non-direct channel IDs
+            return None
+            
         # Try if it's just the channel ID
         if url.startswith('UC') and len(url) == 24:
             return url
@@ -882,145 +832,379 @@ class YouTubeMonitoringSystem:
             
         return None
         
-    async def check_all_channels(self):
-        """Check all monitored channels for new SHORT videos and update existing ones"""
-        logger.info("Starting channel check cycle for SHORTS...")
+    def _query_active_channels(self):
+        """Load all active channels with the columns the listings show"""
+        with SessionLocal() as db:
+            return db.query(Channel).options(load_only(
+                Channel.title, Channel.subscriber_count, Channel.video_count
+            )).filter_by(is_active=True).all()
+            
+    def _query_totals(self):
+        """Count active channels, shorts and all videos (cached briefly to absorb command bursts)"""
+        if self._totals_cache:
+            cached_at, cached_totals = self._totals_cache
+            if time.monotonic() - cached_at < Config.STATS_CACHE_SECONDS:
+                return cached_totals
+                
+        active_channels = select(func.count()).select_from(Channel).where(
+            Channel.is_active == True
+        ).scalar_subquery()
         
-        db = SessionLocal()
-        channels = db.query(Channel).filter_by(is_active=True).all()
-        db.close()
+        with SessionLocal() as db:
+            # One round-trip: channel count as a subquery, shorts and all
+            # videos counted in a single pass over the videos table
+            totals = tuple(db.query(
+                active_channels,
+                func.count(case((Video.is_short == True, 1))),
+                func.count()
+            ).select_from(Video).one())
+            
+        self._totals_cache = (time.monotonic(), totals)
+        return totals
         
-        for channel in channels:
-            try:
-                # Monitor channel for new SHORT videos
-                new_videos = self.youtube_monitor.monitor_channel(channel.channel_id)
-                
-                # Check each SHORT video against threshold
-                for video_data in new_videos:
-                    await self.process_video(video_data, channel)
-                
-                # Update view counts for videos under 3 days old
-                await self.update_recent_video_stats(channel.channel_id)
-                    
-                # Also check recent SHORT videos for threshold crossing
-                await self.check_recent_videos(channel.channel_id)
-                
-            except Exception as e:
-                logger.error(f"Error checking channel {channel.channel_id}: {e}")
-                
-            # Rate limiting between channels
-            await asyncio.sleep(2)
+    def _load_channel_index(self):
+        """Map channel IDs to titles for name lookups"""
+        with SessionLocal() as db:
+            self.channel_index = {
+                channel_id: title or ''
+                for channel_id, title in db.query(Channel.channel_id, Channel.title)
+            }
             
-        logger.info("Channel check cycle completed")
+    def _index_channel(self, channel_id, title):
+        """Add or update a channel in the name index"""
+        # Swap in a new dict so lookups running in other threads never see it change size
+        self.channel_index = {**self.channel_index, channel_id: title or ''}
         
-    async def update_recent_video_stats(self, channel_id):
-        """Update view counts for videos under 3 days old"""
-        db = SessionLocal()
+    def _match_channel_id(self, name, match_id=False):
+        """Return the ID of the first channel whose title (or optionally ID) contains name"""
+        name = name.lower()
+        return next((
+            channel_id for channel_id, title in self.channel_index.items()
+            if name in title.lower() or (match_id and name in channel_id.lower())
+        ), None)
         
-        # Get SHORT videos from last 3 days
-        cutoff = datetime.now(timezone.utc) - timedelta(days=3)
-        recent_videos = db.query(Video).filter(
-            Video.channel_id == channel_id,
-            Video.published_at >= cutoff,
-            Video.is_short == True
-        ).all()
+    def _find_channel(self, name, match_id=False):
+        """Find the first channel whose title (or optionally ID) contains name"""
+        channel_id = self._match_channel_id(name, match_id)
+        if not channel_id:
+            return None
+            
+        # Built from the index, so callers get the ID and title without a query
+        return Channel(channel_id=channel_id, title=self.channel_index[channel_id])
+            
+    def _query_recent_shorts(self, channel_name, limit):
+        """Load the most recent shorts with their channel titles, optionally for one channel"""
+        with SessionLocal() as db:
+            # Join channel titles in so the listing needs a single query
+            shorts_query = db.query(Video, Channel.title).outerjoin(
+                Channel, Channel.channel_id == Video.channel_id
+            ).options(load_only(
+                Video.video_id, Video.title, Video.duration_seconds,
+                Video.view_count, Video.published_at
+            )).filter(Video.is_short == True)
+            
+            channel = None
+            if channel_name:
+                channel = self._find_channel(channel_name)
+                if not channel:
+                    return None, []
+                shorts_query = shorts_query.filter(Video.channel_id == channel.channel_id)
+                
+            videos = shorts_query.order_by(Video.published_at.desc()).limit(limit).all()
+            
+        return channel, videos
         
-        if not recent_videos:
-            db.close()
-            return
+    def _query_top_shorts(self, cutoff_time, count, channel_id=None):
+        """Load the most viewed shorts with their channel titles"""
+        with SessionLocal() as db:
+            # Join channel titles in so the listing needs a single query
+            top_query = db.query(Video, Channel.title).outerjoin(
+                Channel, Channel.channel_id == Video.channel_id
+            ).options(load_only(
+                Video.video_id, Video.title, Video.duration_seconds,
+                Video.view_count, Video.published_at
+            )).filter(Video.is_short == True)
+            
+            if channel_id:
+                top_query = top_query.filter(Video.channel_id == channel_id)
+            if cutoff_time is not None:
+                top_query = top_query.filter(Video.published_at >= cutoff_time)
+                
+            return top_query.order_by(Video.view_count.desc()).limit(count).all()
+            
+    def _add_channel(self, channel_info):
+        """Insert a new channel, returning False if it is already stored"""
+        with SessionLocal() as db:
+            insert = UPSERT_INSERTS.get(db.bind.dialect.name)
+            if insert:
+                # Single statement: the conflict check happens in the INSERT itself
+                result = db.execute(insert(Channel).values(**channel_info).on_conflict_do_nothing(
+                    index_elements=['channel_id']
+                ))
+                if result.rowcount != 1:
+                    return False
+            elif db.get(Channel, channel_info['channel_id']):
+                return False
+            else:
+                db.add(Channel(**channel_info))
+            db.commit()
             
-        updated_count = 0
-        for video in recent_videos:
-            try:
-                # Get updated video statistics from YouTube API
-                updated_stats = self.youtube_monitor.get_video_statistics(video.video_id)
-                if updated_stats:
-                    # Update video with new stats
-                    video.view_count = updated_stats.get('view_count', video.view_count)
-                    video.like_count = updated_stats.get('like_count', video.like_count)
-                    video.comment_count = updated_stats.get('comment_count', video.comment_count)
-                    updated_count += 1
-                    
-                    logger.debug(f"📊 Updated stats for: {video.title[:50]}... ({video.view_count:,} views)")
-                    
-            except Exception as e:
-                logger.error(f"Error updating stats for video {video.video_id}: {e}")
-                continue
-                
-        if updated_count > 0:
+        self._index_channel(channel_info['channel_id'], channel_info['title'])
+        self._totals_cache = None
+        return True
+        
+    def _merge_channel(self, channel_info):
+        """Insert or update a channel"""
+        with SessionLocal() as db:
+            insert = UPSERT_INSERTS.get(db.bind.dialect.name)
+            if insert:
+                # Upsert in one statement instead of merge's SELECT then INSERT/UPDATE
+                stmt = insert(Channel).values(**channel_info)
+                db.execute(stmt.on_conflict_do_update(
+                    index_elements=['channel_id'],
+                    set_={key: stmt.excluded[key] for key in channel_info if key != 'channel_id'}
+                ))
+            else:
+                db.merge(Channel(**channel_info))
+            db.commit()
+            
+        self._index_channel(channel_info['channel_id'], channel_info['title'])
+        self._totals_cache = None
+        
+    def _remove_channel(self, handle):
+        """Delete the first channel matching handle, returning its title"""
+        channel_id = self._match_channel_id(handle, match_id=True)
+        if not channel_id:
+            return None
+            
+        with SessionLocal() as db:
+            result = db.execute(delete(Channel).where(Channel.channel_id == channel_id))
             db.commit()
-            logger.info(f"✅ Updated stats for {updated_count} videos in channel {channel_id}")
             
-        db.close()
+        channel_name = self.channel_index.get(channel_id)
+        if not result.rowcount:
+            return None
+            
+        self.channel_index = {
+            key: title for key, title in self.channel_index.items() if key != channel_id
+        }
+        self._totals_cache = None
+        return channel_name
         
-    async def check_recent_videos(self, channel_id):
-        """Check recent SHORT videos for 400k views threshold - re-monitors under 3 days old"""
-        db = SessionLocal()
+    def _warm_db_pool(self):
+        """Check out a pooled connection once at startup"""
+        with SessionLocal() as db:
+            db.execute(text('SELECT 1'))
+            
+    async def _run_monitor_call(self, func, *args):
+        """Run a blocking YouTubeMonitor call in a worker thread"""
+        return await asyncio.to_thread(func, *args)
+            
+    async def check_all_channels(self):
+        """Check all monitored channels for new SHORT videos and update existing ones"""
+        logger.info("Starting channel check cycle for SHORTS...")
         
-        # Get SHORT videos from last 3 days (regardless of notification status)
-        cutoff = datetime.now(timezone.utc) - timedelta(days=3)
-        recent_videos = db.query(Video).filter(
-            Video.channel_id == channel_id,
-            Video.published_at >= cutoff,
-            Video.is_short == True  # Only check SHORT videos
-        ).all()
+        # One consistent "now" and 3-day cutoff shared by every channel in this cycle
+        self.cycle_now = datetime.now(timezone.utc)
+        self.cycle_cutoff = self.cycle_now - timedelta(days=3)
         
-        if not recent_videos:
-            db.close()
-            return
+        with SessionLocal() as db:
+            channels = db.query(Channel).filter_by(is_active=True).all()
             
-        channel = db.query(Channel).filter_by(channel_id=channel_id).first()
+            # SHORT videos under 3 days old across all channels; channels without any
+            # can skip the recent-video refresh unless this cycle finds new shorts
+            recent_rows = db.query(Video.channel_id, Video.video_id).filter(
+                Video.published_at >= self.cycle_cutoff,
+                Video.is_short == True
+            ).all()
+            channels_with_recent = {channel_id for channel_id, _ in recent_rows}
+            recent_video_ids = [video_id for _, video_id in recent_rows]
+            
+        # Channel metadata used by notification embeds, built once per cycle
+        self.channel_data_cache = {
+            channel.channel_id: {
+                'channel_id': channel.channel_id,
+                'title': channel.title,
+                'thumbnail_url': channel.thumbnail_url
+            }
+            for channel in channels
+        }
         
-        for video in recent_videos:
-            # Calculate hours old for logging
-            if video.published_at.tzinfo is None:
-                published_at = video.published_at.replace(tzinfo=timezone.utc)
-            else:
-                published_at = video.published_at
-            hours_old = (datetime.now(timezone.utc) - published_at).total_seconds() / 3600
+        # Fetch every channel's info up front, 50 channels per API request
+        channel_infos = await self._run_monitor_call(
+            self.youtube_monitor.get_channels_info, [channel.channel_id for channel in channels]
+        )
+        
+        # Refresh the name index each cycle so channels added by the setup scripts and
+        # titles refreshed from the API show up in command lookups; channels outside
+        # this cycle keep their entries
+        self.channel_index = {
+            **self.channel_index,
+            **{
+                channel.channel_id: (channel_infos.get(channel.channel_id) or {}).get('title') or channel.title or ''
+                for channel in channels
+            }
+        }
+        
+        # Fetch stats for every channel's recent shorts together, 50 videos per API request
+        self.cycle_video_stats = await self._run_monitor_call(
+            self.youtube_monitor.get_video_statistics, recent_video_ids
+        )
+        self.cycle_prefetched_ids = set(recent_video_ids)
+        
+        # Check channels concurrently, capped by the channel semaphore
+        await asyncio.gather(
+            *(
+                self._check_channel(
+                    channel,
+                    channel.channel_id in channels_with_recent,
+                    channel_infos.get(channel.channel_id)
+                )
+                for channel in channels
+            ),
+            return_exceptions=True
+        )
             
-            # Check if SHORT video has reached 700k views (and hasn't been notified yet)
-            if video.view_count >= 700000 and not video.notified:
-                # Calculate performance metrics
-                views_per_hour = video.view_count / max(hours_old, 1)
-                
-                performance = {
-                    'hours_old': hours_old,
-                    'views_per_hour': views_per_hour,
-                    'threshold_reached': '700k views',
-                    'performance_ratio': 1.0,  # Default for 700k threshold videos
-                    'percentile': 95  # Default for high-performing videos
-                }
+        self._totals_cache = None
+        logger.info("Channel check cycle completed")
+        
+    async def _check_channel(self, channel, has_recent_videos=True, channel_info=None):
+        """Monitor a single channel and process its recent SHORT videos"""
+        async with self.channel_semaphore:
+            try:
+                # Monitor channel for new SHORT videos
+                # Channels without recent shorts only need a full check when they upload,
+                # and stats prefetched for the cycle aren't fetched again
+                new_videos = await self._run_monitor_call(
+                    self.youtube_monitor.monitor_channel, channel.channel_id, channel_info,
+                    not has_recent_videos, self.cycle_video_stats
+                )
                 
-                # Prepare video data
-                video_data = {
-                    'video_id': video.video_id,
-                    'title': video.title,
-                    'description': video.description,
-                    'published_at': video.published_at.isoformat(),
-                    'thumbnail_url': video.thumbnail_url,
-                    'view_count': video.view_count,
-                    'like_count': video.like_count,
-                    'comment_count': video.comment_count,
-                    'duration_seconds': video.duration_seconds,
-                    'is_short': video.is_short
-                }
+                # New uploads change the channel's recent-video average
+                if new_videos:
+                    self.analytics.invalidate_channel_average(channel.channel_id)
+                    
+                # Check each SHORT video against threshold
+                for video_data in new_videos:
+                    await self.process_video(video_data, channel)
                 
-                await self.send_notification(video_data, channel, performance)
+                # Update view counts for videos under 3 days old and check the threshold
+                if has_recent_videos or new_videos:
+                    await self.refresh_recent_videos(channel)
                 
-                # Mark as notified
-                video.notified = True
-                db.commit()
+            except Exception as e:
+                logger.error(f"Error checking channel {channel.channel_id}: {e}")
+        
+    async def _run_check_and_notify(self, followup):
+        """Run a full channel check and report completion through the given followup webhook"""
+        try:
+            await self.check_all_channels()
+            await followup.send("Manual check completed!")
+        except Exception as e:
+            logger.error(f"Error in manual check: {e}")
+            
+    async def refresh_recent_videos(self, channel):
+        """Refresh stats for SHORT videos under 3 days old and notify when they reach 700k views"""
+        with SessionLocal() as db:
+            # Get SHORT videos from last 3 days (regardless of notification status)
+            now = self.cycle_now
+            cutoff = self.cycle_cutoff
+            # Descriptions are only needed for the rare notification, so load them lazily
+            recent_videos = db.query(Video).options(defer(Video.description)).filter(
+                Video.channel_id == channel.channel_id,
+                Video.published_at >= cutoff,
+                Video.is_short == True  # Only check SHORT videos
+            ).all()
+            
+            if not recent_videos:
+                return
                 
-                logger.info(f"🎉 700k threshold reached! Notified for: {video.title[:50]}... ({video.view_count:,} views)")
-            elif video.view_count >= 700000 and video.notified:
-                # Log that we're skipping already notified videos
-                logger.debug(f"⏭️ Skipping already notified video: {video.title[:50]}... ({video.view_count:,} views)")
-            else:
-                # Log videos that are still under threshold
-                logger.debug(f"📊 Monitoring: {video.title[:50]}... ({video.view_count:,} views) - {hours_old:.1f}h old")
+            # Stats were prefetched for the whole cycle; only videos stored since then need a lookup
+            missing_ids = [
+                video.video_id for video in recent_videos if video.video_id not in self.cycle_prefetched_ids
+            ]
+            new_stats = {}
+            if missing_ids:
+                new_stats = await self._run_monitor_call(self.youtube_monitor.get_video_statistics, missing_ids)
+            
+            # Collect changes and write them as one executemany UPDATE keyed on video_id
+            video_updates = []
+            notifications = []
+            debug_logging = logger.isEnabledFor(logging.DEBUG)
+            for video in recent_videos:
+                updated_stats = new_stats.get(video.video_id) or self.cycle_video_stats.get(video.video_id, {})
+                view_count = updated_stats.get('view_count', video.view_count)
+                like_count = updated_stats.get('like_count', video.like_count)
+                comment_count = updated_stats.get('comment_count', video.comment_count)
+                
+                # Check if SHORT video has reached 700k views (and hasn't been notified yet)
+                notify = view_count >= 700000 and not video.notified
+                
+                # Age is only needed for the notification payload and debug logging
+                if notify or debug_logging:
+                    if video.published_at.tzinfo is None:
+                        published_at = video.published_at.replace(tzinfo=timezone.utc)
+                    else:
+                        published_at = video.published_at
+                    hours_old = (now - published_at).total_seconds() / 3600
                 
-        db.close()
+                if notify:
+                    # Calculate performance metrics
+                    views_per_hour = view_count / max(hours_old, 1)
+                    
+                    performance = {
+                        'hours_old': hours_old,
+                        'views_per_hour': views_per_hour,
+                        'threshold_reached': '700k views',
+                        'performance_ratio': 1.0,  # Default for 700k threshold videos
+                        'percentile': 95  # Default for high-performing videos
+                    }
+                    
+                    # Prepare video data
+                    video_data = VideoDTO(
+                        video_id=video.video_id,
+                        title=video.title,
+                        description=video.description,
+                        published_at=video.published_at,
+                        thumbnail_url=video.thumbnail_url,
+                        view_count=view_count,
+                        like_count=like_count,
+                        comment_count=comment_count,
+                        duration_seconds=video.duration_seconds,
+                        is_short=video.is_short
+                    )
+                    
+                    notifications.append((video_data, performance))
+                    
+                    logger.info(f"🎉 700k threshold reached! Notified for: {video.title[:50]}... ({view_count:,} views)")
+                elif debug_logging:
+                    if view_count >= 700000:
+                        # Log that we're skipping already notified videos
+                        logger.debug(f"⏭️ Skipping already notified video: {video.title[:50]}... ({view_count:,} views)")
+                    else:
+                        # Log videos that are still under threshold
+                        logger.debug(f"📊 Monitoring: {video.title[:50]}... ({view_count:,} views) - {hours_old:.1f}h old")
+                    
+                if updated_stats or notify:
+                    video_updates.append({
+                        'video_id': video.video_id,
+                        'view_count': view_count,
+                        'like_count': like_count,
+                        'comment_count': comment_count,
+                        'notified': video.notified
+                    })
+                    
+            # Send this channel's notifications together, then mark only the delivered ones
+            # as notified so the rest are retried next cycle
+            sent_ids = await self.send_notifications(notifications, channel)
+            for video_update in video_updates:
+                if video_update['video_id'] in sent_ids:
+                    video_update['notified'] = True
+                    
+            if video_updates:
+                db.execute(update(Video), video_updates)
+                db.commit()
+                logger.info(f"✅ Updated stats for {len(video_updates)} videos in channel {channel.channel_id}")
         
     async def process_video(self, video_data, channel):
         """Process a new SHORT video"""
@@ -1031,29 +1215,40 @@ class YouTubeMonitoringSystem:
         # before being evaluated for the threshold
         pass
         
-    async def send_notification(self, video_data, channel, performance):
-        """Send notification to Discord for SHORT videos"""
-        if not self.discord_bot:
-            return
+    async def send_notifications(self, notifications, channel):
+        """Send notifications to Discord for a channel's SHORT videos, returning the sent video ids"""
+        if not self.discord_bot or not notifications:
+            return set()
             
         try:
-            # Create channel data dict
-            channel_data = {
-                'channel_id': channel.channel_id,
-                'title': channel.title,
-                'thumbnail_url': channel.thumbnail_url
-            }
+            # Reuse the channel data dict built for this check cycle
+            channel_data = self.channel_data_cache.get(channel.channel_id)
+            if not channel_data:
+                channel_data = {
+                    'channel_id': channel.channel_id,
+                    'title': channel.title,
+                    'thumbnail_url': channel.thumbnail_url
+                }
             
-            # Create embed optimized for SHORTS
-            embed = self.discord_bot.create_video_embed(video_data, channel_data, performance)
+            # Create embeds optimized for SHORTS
+            embeds = [
+                self.discord_bot.create_video_embed(video_data, channel_data, performance)
+                for video_data, performance in notifications
+            ]
             
-            # Send notification
-            await self.discord_bot.send_notification(Config.DISCORD_CHANNEL_ID, embed)
+            # Send notifications, several embeds per message
+            sent_indexes = await self.discord_bot.send_notifications(Config.DISCORD_CHANNEL_ID, embeds)
             
-            logger.info(f"SHORT video notification sent: {video_data['title']}")
+            sent_ids = set()
+            for index in sent_indexes:
+                video_data = notifications[index][0]
+                sent_ids.add(video_data.video_id)
+                logger.info(f"SHORT video notification sent: {video_data.title}")
+            return sent_ids
             
         except Exception as e:
             logger.error(f"Error sending notification: {e}")
+            return set()
             
 
             
@@ -1061,6 +1256,13 @@ class YouTubeMonitoringSystem:
         """Start the monitoring system for SHORTS"""
         logger.info("Starting YouTube SHORTS Monitoring System...")
         
+        # Bring an existing database's indexes up to date, open a database connection up
+        # front so the first command doesn't pay for it, and load the channel name index
+        # used by command lookups
+        await asyncio.to_thread(upgrade_schema)
+        await asyncio.to_thread(self._warm_db_pool)
+        await asyncio.to_thread(self._load_channel_index)
+        
         # Initialize Discord bot
         await self.initialize_discord_bot()
         
@@ -1076,23 +1278,38 @@ class YouTubeMonitoringSystem:
         # Run initial check
         await self.check_all_channels()
         
-        # Start periodic monitoring
+        # Start periodic monitoring as a background task on the bot's event loop
+        self.monitoring_task = asyncio.create_task(self._periodic_monitoring())
+        
+        # Keep the bot running
+        await bot_task
+        
+    async def _periodic_monitoring(self):
+        """Re-check all channels every CHECK_INTERVAL_MINUTES"""
         logger.info(f"Starting periodic monitoring every {Config.CHECK_INTERVAL_MINUTES} minutes")
         
         while self.monitoring_active:
             try:
-                await asyncio.sleep(Config.CHECK_INTERVAL_MINUTES * 60)  # Convert to seconds
+                if await self._wait_for_stop(Config.CHECK_INTERVAL_MINUTES * 60):  # Convert to seconds
+                    break
                 await self.check_all_channels()
             except Exception as e:
                 logger.error(f"Error in monitoring cycle: {e}")
-                await asyncio.sleep(60)  # Wait 1 minute before retrying
+                if await self._wait_for_stop(60):  # Wait 1 minute before retrying
+                    break
         
-        # Keep the bot running
-        await bot_task
+    async def _wait_for_stop(self, timeout):
+        """Sleep for up to timeout seconds, returning True as soon as stop() is called"""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
         
     def stop(self):
         """Stop the monitoring system"""
         self.monitoring_active = False
+        self.stop_event.set()
         if self.discord_bot:
             asyncio.create_task(self.discord_bot.close())
         if self.youtube_monitor:
@@ -1105,7 +1322,11 @@ if __name__ == "__main__":
     system = YouTubeMonitoringSystem()
     
     try:
-        asyncio.run(system.start())
+        # Prefer uvloop's libuv-based event loop where it's installed
+        if uvloop:
+            uvloop.run(system.start())
+        else:
+            asyncio.run(system.start())
     except KeyboardInterrupt:
         logger.info("Shutting down...")
         system.stop() 
\ No newline at end of file
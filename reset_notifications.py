@@ -3,6 +3,7 @@
 Reset Notifications - Reset notification status for testing new average-based system
 """
 
+from sqlalchemy import case, func
 from database import SessionLocal, Video
 import logging
 
@@ -14,21 +15,17 @@ def reset_notifications():
     print("🔄 RESETTING NOTIFICATION STATUS")
     print("=" * 50)
     
-    db = SessionLocal()
-    
-    # Get all videos
-    all_videos = db.query(Video).all()
-    print(f"📋 Found {len(all_videos)} total videos")
-    
-    # Reset notification status
-    updated_count = 0
-    for video in all_videos:
-        if video.notified:
-            video.notified = False
-            updated_count += 1
-    
-    db.commit()
-    db.close()
+    with SessionLocal() as db:
+        # Count videos without loading them
+        total_videos = db.query(Video).count()
+        print(f"📋 Found {total_videos} total videos")
+        
+        # Reset notification status with a single bulk UPDATE
+        updated_count = db.query(Video).filter(
+            Video.notified == True
+        ).update({Video.notified: False}, synchronize_session=False)
+        
+        db.commit()
     
     print(f"✅ Reset notification status for {updated_count} videos")
     print("📝 All videos will now be eligible for notifications")
@@ -42,28 +39,27 @@ def check_notification_status():
     print("📊 CHECKING NOTIFICATION STATUS")
     print("=" * 50)
     
-    db = SessionLocal()
-    
-    # Count videos by notification status
-    notified_videos = db.query(Video).filter(Video.notified == True).count()
-    unnotified_videos = db.query(Video).filter(Video.notified == False).count()
-    total_videos = db.query(Video).count()
-    
-    print(f"📋 Total videos: {total_videos}")
-    print(f"✅ Already notified: {notified_videos}")
-    print(f"⏳ Pending notification: {unnotified_videos}")
-    
-    # Show recent unnotified videos
-    recent_unnotified = db.query(Video).filter(
-        Video.notified == False
-    ).order_by(Video.published_at.desc()).limit(10).all()
-    
-    if recent_unnotified:
-        print(f"\n📱 Recent unnotified videos:")
-        for video in recent_unnotified:
-            print(f"  • {video.title[:50]}... ({video.view_count:,} views)")
-    
-    db.close()
+    with SessionLocal() as db:
+        # Count videos by notification status in one pass
+        notified_videos, unnotified_videos, total_videos = db.query(
+            func.count(case((Video.notified == True, 1))),
+            func.count(case((Video.notified == False, 1))),
+            func.count()
+        ).select_from(Video).one()
+        
+        print(f"📋 Total videos: {total_videos}")
+        print(f"✅ Already notified: {notified_videos}")
+        print(f"⏳ Pending notification: {unnotified_videos}")
+        
+        # Show recent unnotified videos
+        recent_unnotified = db.query(Video.title, Video.view_count).filter(
+            Video.notified == False
+        ).order_by(Video.published_at.desc()).limit(10).all()
+        
+        if recent_unnotified:
+            print(f"\n📱 Recent unnotified videos:")
+            for video in recent_unnotified:
+                print(f"  • {video.title[:50]}... ({video.view_count:,} views)")
     
     print("\n" + "=" * 50)
     print("✅ Status check complete!")
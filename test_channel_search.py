@@ -1,4 +1,4 @@
-python batch_add_channels.py#!/usr/bin/env python3
+#!/usr/bin/env python3
 """
 Test Channel Search - Debug channel search functionality
 """
@@ -80,6 +80,11 @@ def test_channel_search():
             
             if result['items']:
                 print(f"Found {len(result['items'])} channels:")
+                
+                # Get full channel info for every result in one request
+                channel_ids = [item['snippet']['channelId'] for item in result['items']]
+                channels_info = monitor.get_channels_info(channel_ids)
+                
                 for i, item in enumerate(result['items'], 1):
                     channel_id = item['snippet']['channelId']
                     title = item['snippet']['title']
@@ -89,8 +94,7 @@ def test_channel_search():
                     print(f"     ID: {channel_id}")
                     print(f"     Description: {description}...")
                     
-                    # Get full channel info
-                    full_info = monitor.get_channel_info(channel_id)
+                    full_info = channels_info.get(channel_id)
                     if full_info:
                         print(f"     Subscribers: {full_info['subscriber_count']:,}")
                         print(f"     Videos: {full_info['video_count']:,}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test Monitor Skip - Check that quiet channels are only skipped once their newest upload is stored
+"""
+
+import os
+import tempfile
+
+# Use a throwaway database so the test never touches youtube_monitor.db
+db_path = os.path.join(tempfile.mkdtemp(), 'test_monitor_skip.db')
+os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+os.environ.setdefault('DISCORD_CHANNEL_ID', '0')
+
+import threading
+from youtube_monitor import YouTubeMonitor
+from database import SessionLocal, Video
+
+CHANNEL_ID = 'UCtest'
+
+def make_monitor(stats_available):
+    """Build a YouTubeMonitor whose API calls are replaced with canned responses"""
+    monitor = YouTubeMonitor.__new__(YouTubeMonitor)
+    monitor._latest_upload_ids = {}
+    monitor._key_lock = threading.RLock()
+    monitor._uncommitted_quota_updates = 0
+    monitor.db = SessionLocal()
+    monitor.stats_available = stats_available
+    
+    monitor.get_channel_info = lambda channel_id: {
+        'channel_id': channel_id,
+        'title': 'Test Channel',
+        'description': '',
+        'thumbnail_url': 'https://example.com/thumb.jpg',
+        'subscriber_count': 1,
+        'video_count': 1,
+        'upload_playlist_id': 'UUtest',
+        'is_active': True
+    }
+    monitor.get_playlist_videos = lambda playlist_id, max_results: [{
+        'video_id': 'short1',
+        'title': 'New short',
+        'description': '',
+        'published_at': '2024-01-01T00:00:00Z',
+        'thumbnail_url': 'https://example.com/short1.jpg',
+        'channel_id': CHANNEL_ID
+    }]
+    
+    def get_video_statistics(video_ids):
+        # Simulate a failed batch (API error, exhausted quota or yt-dlp failure)
+        if not monitor.stats_available:
+            return {}
+        return {video_id: {
+            'view_count': 10,
+            'like_count': 1,
+            'comment_count': 0,
+            'duration': 'PT30S',
+            'duration_seconds': 30,
+            'is_short': True
+        } for video_id in video_ids}
+    monitor.get_video_statistics = get_video_statistics
+    
+    return monitor
+
+def test_monitor_skip():
+    """Test that a failed stats lookup doesn't make the channel skip its new short"""
+    print("🔍 TESTING MONITOR SKIP")
+    print("=" * 50)
+    
+    monitor = make_monitor(stats_available=False)
+    
+    # First check: stats lookup fails, so nothing can be stored
+    monitor.monitor_channel(CHANNEL_ID, skip_if_unchanged=True)
+    assert CHANNEL_ID not in monitor._latest_upload_ids, "upload recorded without stats"
+    print("✅ Upload not recorded when its stats are missing")
+    
+    # Second check: stats are back, so the short must be found instead of skipped
+    monitor.stats_available = True
+    new_videos = monitor.monitor_channel(CHANNEL_ID, skip_if_unchanged=True)
+    assert [video['video_id'] for video in new_videos] == ['short1'], new_videos
+    with SessionLocal() as db:
+        assert db.get(Video, 'short1') is not None, "short was not stored"
+    print("✅ Short stored once stats are available")
+    
+    # Third check: nothing new was uploaded, so the channel is skipped
+    assert monitor.monitor_channel(CHANNEL_ID, skip_if_unchanged=True) == []
+    assert monitor._latest_upload_ids[CHANNEL_ID] == 'short1'
+    print("✅ Unchanged channel skipped after the short is stored")
+    
+    monitor.close()
+    print("\n" + "=" * 50)
+    print("✅ Monitor skip test complete!")
+
+if __name__ == "__main__":
+    test_monitor_skip()
@@ -1,35 +1,77 @@
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import NoTranscriptFound, TranscriptsDisabled
+from collections import OrderedDict
+from config import Config
+import json
 import logging
+import os
+import time
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 class TranscriptHandler:
     def __init__(self):
         self.supported_languages = ['en', 'es', 'fr', 'de', 'ja', 'ko', 'pt', 'ru']
+        self.cache_dir = Config.TRANSCRIPT_CACHE_DIR
+        # Most recently used transcripts, kept in memory to skip re-reading the disk cache
+        self._recent_transcripts = OrderedDict()
         
     def get_transcript(self, video_id, preferred_language='en'):
-        """Fetch transcript for a video"""
+        """Fetch transcript for a video, reusing a copy cached in memory or on disk"""
+        key = (video_id, preferred_language)
+        transcript = self._recent_transcripts.get(key)
+        if transcript is None:
+            transcript = self._load_transcript(video_id, preferred_language)
+            if not transcript:
+                return transcript
+                
+            self._recent_transcripts[key] = transcript
+            if len(self._recent_transcripts) > Config.TRANSCRIPT_MEMORY_CACHE_SIZE:
+                self._recent_transcripts.popitem(last=False)
+        else:
+            self._recent_transcripts.move_to_end(key)
+            
+        # Callers share the cached dict, so it must be treated as read-only
+        return transcript
+        
+    def _load_transcript(self, video_id, preferred_language):
+        """Load a transcript from the disk cache, fetching and caching it on a miss"""
+        cache_path = os.path.join(self.cache_dir, f"{video_id}_{preferred_language}.json")
         try:
-            # Try to get manual transcript first
-            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+            # Refetch entries older than the cache lifetime so edited captions get picked up
+            if time.time() - os.path.getmtime(cache_path) < Config.TRANSCRIPT_CACHE_DAYS * 86400:
+                with open(cache_path, encoding='utf-8') as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
             
-            # Check for manual transcripts
+        transcript = self._fetch_transcript(video_id, preferred_language)
+        if transcript:
             try:
-                transcript = transcript_list.find_manually_created_transcript([preferred_language])
-                return self._format_transcript(transcript.fetch())
-            except:
-                pass
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Write to a temp file first so a crash never leaves a partial cache entry
+                tmp_path = f"{cache_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(transcript, f)
+                os.replace(tmp_path, cache_path)
+            except (OSError, TypeError) as e:
+                logger.warning(f"Could not cache transcript for {video_id}: {e}")
                 
-            # Fall back to auto-generated
-            try:
-                transcript = transcript_list.find_generated_transcript([preferred_language])
-                return self._format_transcript(transcript.fetch())
-            except:
-                # Try any available language
-                for transcript in transcript_list:
-                    if transcript.language_code in self.supported_languages:
-                        return self._format_transcript(transcript.fetch())
+        return transcript
+        
+    def _fetch_transcript(self, video_id, preferred_language):
+        """Fetch transcript for a video from YouTube"""
+        try:
+            # Try to get manual transcript first
+            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+            
+            # Manual before generated per language, preferred language first
+            languages = [preferred_language] + [
+                lang for lang in self.supported_languages if lang != preferred_language
+            ]
+            transcript = transcript_list.find_transcript(languages)
+            return self._format_transcript(transcript.fetch())
                         
         except (NoTranscriptFound, TranscriptsDisabled) as e:
             logger.warning(f"No transcript available for video {video_id}: {e}")
@@ -43,17 +85,16 @@ class TranscriptHandler:
         if not transcript_data:
             return None
             
-        # Combine all text segments
-        full_text = ' '.join([segment['text'] for segment in transcript_data])
-        
-        # Create time-stamped version
+        # Build the plain and time-stamped text in a single pass over the segments
+        texts = []
         timestamped = []
         for segment in transcript_data:
-            time = self._seconds_to_time(segment['start'])
-            timestamped.append(f"[{time}] {segment['text']}")
+            text = segment['text']
+            texts.append(text)
+            timestamped.append(f"[{self._seconds_to_time(segment['start'])}] {text}")
             
         return {
-            'full_text': full_text,
+            'full_text': ' '.join(texts),
             'timestamped': '\n'.join(timestamped),
             'segments': transcript_data,
             'duration': transcript_data[-1]['start'] + transcript_data[-1]['duration'] if transcript_data else 0
@@ -71,32 +112,25 @@ class TranscriptHandler:
             return []
             
         segments = transcript_data['segments']
-        
-        # Score segments based on length and position
-        scored_segments = []
         total_duration = transcript_data['duration']
         
-        for i, segment in enumerate(segments):
-            # Favor longer segments
-            length_score = len(segment['text'].split())
-            
-            # Favor segments from important parts (beginning, middle, end)
-            position = segment['start'] / total_duration if total_duration > 0 else 0
-            if position < 0.1:  # Beginning
-                position_score = 1.5
-            elif 0.4 < position < 0.6:  # Middle
-                position_score = 1.2
-            elif position > 0.9:  # End
-                position_score = 1.3
-            else:
-                position_score = 1.0
-                
-            total_score = length_score * position_score
-            scored_segments.append((segment, total_score))
-            
-        # Sort by score and return top segments
-        scored_segments.sort(key=lambda x: x[1], reverse=True)
-        return [seg[0] for seg in scored_segments[:max_segments]]
+        # Score all segments at once: favor longer segments...
+        length_scores = np.fromiter((len(segment['text'].split()) for segment in segments), dtype=np.float64, count=len(segments))
+        
+        # ...from important parts (beginning, middle, end)
+        if total_duration > 0:
+            positions = np.fromiter((segment['start'] for segment in segments), dtype=np.float64, count=len(segments)) / total_duration
+        else:
+            positions = np.zeros(len(segments))
+        position_scores = np.select(
+            [positions < 0.1, (positions > 0.4) & (positions < 0.6), positions > 0.9],
+            [1.5, 1.2, 1.3],
+            default=1.0
+        )
+        
+        # Stable sort keeps ties in transcript order, as before
+        top_indices = np.argsort(-(length_scores * position_scores), kind='stable')[:max_segments]
+        return [segments[i] for i in top_indices]
         
     def create_summary_preview(self, transcript_data, max_length=500):
         """Create a preview summary from transcript"""
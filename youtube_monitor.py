@@ -1,21 +1,84 @@
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from googleapiclient.model import JsonModel
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select
 import time
-import re
+import threading
+from urllib.parse import parse_qs, urlparse
+from functools import lru_cache
+import orjson
 from config import Config
 from database import SessionLocal, Channel, Video, ViewSnapshot, ApiKeyUsage
 import logging
 
+try:
+    from yt_dlp import YoutubeDL
+except ImportError:  # yt-dlp is only needed as a fallback once API quota runs out
+    YoutubeDL = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DURATION_UNIT_SECONDS = {'H': 3600, 'M': 60, 'S': 1}
+# Error reasons returned for a bad API key (legacy "errors" list and newer google.rpc details)
+INVALID_KEY_REASONS = {'keyInvalid', 'API_KEY_INVALID'}
+
+@lru_cache(maxsize=8192)
+def parse_duration(duration_str):
+    """Parse an ISO 8601 duration like "PT1M30S" to seconds"""
+    # Only time durations are handled; anything else (e.g. "P0D" for live streams) is 0
+    if not duration_str.startswith('PT'):
+        return 0
+        
+    total = 0
+    number = 0
+    for char in duration_str[2:]:
+        if '0' <= char <= '9':
+            number = number * 10 + ord(char) - 48
+        else:
+            total += number * DURATION_UNIT_SECONDS.get(char, 0)
+            number = 0
+    return total
+
+class OrjsonModel(JsonModel):
+    """JsonModel that parses API responses with orjson instead of the stdlib json module"""
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode('utf-8') if isinstance(content, bytes) else content
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
 class YouTubeMonitor:
     def __init__(self):
         self.api_keys = Config.YOUTUBE_API_KEYS
         self.current_key_index = 0
         self.youtube = None
-        self.db = SessionLocal()
+        self._youtube_clients = {}
+        # httplib2 connections aren't thread-safe, so each worker thread gets its own
+        # keep-alive connection, shared by every key's client
+        self._thread_local = threading.local()
+        # Guards key rotation and the key usage rows held in self.db
+        self._key_lock = threading.RLock()
+        # Key usage rows stay loaded across commits instead of reloading on next access
+        self.db = SessionLocal(expire_on_commit=False)
+        self._quota_status_cache = None
+        # ApiKeyUsage rows by key index, loaded once and updated in place
+        self._key_usage = {}
+        self._uncommitted_quota_updates = 0
+        # Last response per request, keyed for If-None-Match revalidation (least recently used first)
+        self._etag_cache = OrderedDict()
+        self._etag_lock = threading.Lock()
+        # Handle searches cost 100 units, so remember which channel each resolved to
+        self._handle_channel_ids = {}
+        # Newest upload seen per channel at its last completed check
+        self._latest_upload_ids = {}
         
         # Initialize API key tracking
         self._initialize_api_keys()
@@ -23,15 +86,17 @@ class YouTubeMonitor:
         
     def _initialize_api_keys(self):
         """Initialize or update API key usage tracking"""
+        self._key_usage = {
+            key_usage.api_key_index: key_usage for key_usage in self.db.query(ApiKeyUsage)
+        }
+        
         for i, api_key in enumerate(self.api_keys):
             if api_key:
                 # Use last 6 chars as identifier (for logging without exposing full key)
                 identifier = api_key[-6:]
                 
                 # Check if key exists in database
-                key_usage = self.db.query(ApiKeyUsage).filter_by(
-                    api_key_index=i
-                ).first()
+                key_usage = self._key_usage.get(i)
                 
                 if not key_usage:
                     key_usage = ApiKeyUsage(
@@ -41,6 +106,7 @@ class YouTubeMonitor:
                         last_reset=datetime.now(timezone.utc).replace(hour=0, minute=0, second=0)
                     )
                     self.db.add(key_usage)
+                    self._key_usage[i] = key_usage
                     
                 # Reset if new day
                 self._check_quota_reset(key_usage)
@@ -59,17 +125,47 @@ class YouTubeMonitor:
     def _build_youtube_client(self):
         """Build YouTube client with current API key"""
         if self.current_key_index < len(self.api_keys):
-            self.youtube = build('youtube', 'v3', 
-                               developerKey=self.api_keys[self.current_key_index])
+            # Keep one client per key; all of them share the same open HTTP connection
+            self.youtube = self._youtube_clients.get(self.current_key_index)
+            if self.youtube is None:
+                self.youtube = build('youtube', 'v3', 
+                                   developerKey=self.api_keys[self.current_key_index],
+                                   http=self._get_http(),
+                                   model=OrjsonModel())
+                self._youtube_clients[self.current_key_index] = self.youtube
             logger.info(f"Using API key index {self.current_key_index}")
         else:
             raise Exception("No valid API keys available")
             
+    def _get_http(self):
+        """Get this thread's HTTP connection for API requests"""
+        http = getattr(self._thread_local, 'http', None)
+        if http is None:
+            http = self._thread_local.http = build_http()
+        return http
+        
+    def _execute(self, request):
+        """Execute an API request on this thread's HTTP connection"""
+        # Remember which key sent it, so its quota is charged there even if another thread rotates
+        self._thread_local.key_index = self._key_index_for(request.uri)
+        return request.execute(http=self._get_http())
+        
+    def _key_index_for(self, uri):
+        """Get the index of the API key a request URI was sent with"""
+        key = parse_qs(urlparse(uri or '').query).get('key', [None])[0]
+        if key in self.api_keys:
+            return self.api_keys.index(key)
+        return self.current_key_index
+        
+    def _take_request_key_index(self):
+        """Get the key index of this thread's last request, falling back to the current key"""
+        key_index = getattr(self._thread_local, 'key_index', None)
+        self._thread_local.key_index = None
+        return self.current_key_index if key_index is None else key_index
+        
     def _get_current_key_usage(self):
         """Get current API key usage record"""
-        return self.db.query(ApiKeyUsage).filter_by(
-            api_key_index=self.current_key_index
-        ).first()
+        return self._key_usage.get(self.current_key_index)
         
     def _should_rotate_key(self, key_usage):
         """Check if we should rotate to next API key"""
@@ -85,6 +181,11 @@ class YouTubeMonitor:
         
     def _rotate_api_key(self, force=False):
         """Rotate to next available API key"""
+        with self._key_lock:
+            return self._rotate_to_next_key(force)
+            
+    def _rotate_to_next_key(self, force):
+        """Move current_key_index to the next active key with quota left"""
         original_index = self.current_key_index
         attempts = 0
         
@@ -113,40 +214,82 @@ class YouTubeMonitor:
         logger.error("No available API keys with remaining quota!")
         return False
         
-    def _handle_api_error(self, error):
+    def _handle_api_error(self, error, key_index=None):
         """Handle API errors and rotate keys if necessary"""
-        key_usage = self._get_current_key_usage()
+        self._thread_local.key_index = None
+        if key_index is None:
+            key_index = self._key_index_for(getattr(error, 'uri', None))
+        with self._key_lock:
+            return self._record_api_error(error, key_index)
+            
+    def _error_reasons(self, error):
+        """Get the reason codes from both the errors list and google.rpc details of an API error"""
+        # HttpError.error_details keeps only the first of these lists, so read the body itself
+        try:
+            body = orjson.loads(error.content)
+        except (AttributeError, TypeError, orjson.JSONDecodeError):
+            return set()
+        if isinstance(body, list) and body:
+            body = body[0]
+        error_body = body.get('error') if isinstance(body, dict) else None
+        if not isinstance(error_body, dict):
+            return set()
+            
+        entries = []
+        for key in ('errors', 'details'):
+            if isinstance(error_body.get(key), list):
+                entries.extend(error_body[key])
+        return {entry.get('reason') for entry in entries if isinstance(entry, dict)}
+        
+    def _record_api_error(self, error, key_index):
+        """Count an API error against the key that sent it, rotating if it's exhausted or invalid"""
+        key_usage = self._key_usage.get(key_index)
         key_usage.error_count += 1
         key_usage.last_error = datetime.now(timezone.utc)
+        self._quota_status_cache = None
+        reasons = self._error_reasons(error)
         
         if hasattr(error, 'resp') and error.resp.status == 403:
             # Quota exceeded error
-            if 'quotaExceeded' in str(error):
+            if 'quotaExceeded' in reasons:
                 logger.warning(f"Quota exceeded for key {key_usage.api_key_identifier}")
                 key_usage.quota_used = Config.DAILY_QUOTA_LIMIT
                 self.db.commit()
                 
-                # Try to rotate to another key
-                if self._rotate_api_key():
+                # Try to rotate to another key, unless another thread already did
+                if key_index != self.current_key_index or self._rotate_api_key():
                     return True
                     
         elif hasattr(error, 'resp') and error.resp.status == 400:
             # Bad request - might be invalid API key
-            if 'API key not valid' in str(error):
+            if reasons & INVALID_KEY_REASONS or 'API key not valid' in getattr(error, 'reason', ''):
                 logger.error(f"Invalid API key {key_usage.api_key_identifier}")
                 key_usage.is_active = False
                 self.db.commit()
                 
-                # Try to rotate to another key
-                if self._rotate_api_key():
+                # Try to rotate to another key, unless another thread already did
+                if key_index != self.current_key_index or self._rotate_api_key():
                     return True
                     
         self.db.commit()
         return False
         
-    def add_quota_usage(self, units):
-        """Track quota usage for current key"""
-        key_usage = self._get_current_key_usage()
+    def add_quota_usage(self, units, key_index=None):
+        """Track quota usage for the key that sent this thread's last request"""
+        if key_index is None:
+            key_index = self._take_request_key_index()
+        with self._key_lock:
+            self._record_quota_usage(units, key_index)
+            
+    def commit_quota_usage(self):
+        """Commit any quota updates still pending from add_quota_usage"""
+        with self._key_lock:
+            self.db.commit()
+            self._uncommitted_quota_updates = 0
+            
+    def _record_quota_usage(self, units, key_index):
+        """Add units to a key's usage and rotate when the current key nears the threshold"""
+        key_usage = self._key_usage.get(key_index)
         self._check_quota_reset(key_usage)
         
         key_usage.quota_used += units
@@ -158,28 +301,41 @@ class YouTubeMonitor:
                    f"Used {units} units ({key_usage.quota_used}/{Config.DAILY_QUOTA_LIMIT})")
         
         # Check if we should preemptively rotate
-        if self._should_rotate_key(key_usage):
+        if key_index == self.current_key_index and self._should_rotate_key(key_usage):
             logger.info("Preemptively rotating API key due to quota threshold")
             self._rotate_api_key()
             
-        self.db.commit()
+        # Commit in batches; monitor_channel and close() commit whatever is pending
+        self._uncommitted_quota_updates += 1
+        if self._uncommitted_quota_updates >= Config.QUOTA_COMMIT_INTERVAL:
+            self.db.commit()
+            self._uncommitted_quota_updates = 0
+        self._quota_status_cache = None
         
     def get_quota_status(self):
-        """Get quota status for all API keys"""
+        """Get quota status for all API keys (cached briefly to absorb command bursts)"""
+        if self._quota_status_cache:
+            cached_at, cached_status = self._quota_status_cache
+            if time.monotonic() - cached_at < Config.QUOTA_STATUS_CACHE_SECONDS:
+                return cached_status
+                
         status = []
-        for i in range(len(self.api_keys)):
-            key_usage = self.db.query(ApiKeyUsage).filter_by(api_key_index=i).first()
-            if key_usage:
-                self._check_quota_reset(key_usage)
-                status.append({
-                    'index': i,
-                    'identifier': key_usage.api_key_identifier,
-                    'quota_used': key_usage.quota_used,
-                    'quota_remaining': Config.DAILY_QUOTA_LIMIT - key_usage.quota_used,
-                    'is_active': key_usage.is_active,
-                    'last_used': key_usage.last_used,
-                    'error_count': key_usage.error_count
-                })
+        with self._key_lock:
+            for i in range(len(self.api_keys)):
+                key_usage = self._key_usage.get(i)
+                if key_usage:
+                    self._check_quota_reset(key_usage)
+                    status.append({
+                        'index': i,
+                        'identifier': key_usage.api_key_identifier,
+                        'quota_used': key_usage.quota_used,
+                        'quota_remaining': Config.DAILY_QUOTA_LIMIT - key_usage.quota_used,
+                        'is_active': key_usage.is_active,
+                        'last_used': key_usage.last_used,
+                        'error_count': key_usage.error_count
+                    })
+                    
+        self._quota_status_cache = (time.monotonic(), status)
         return status
         
     def _api_request_with_retry(self, request_func, *args, **kwargs):
@@ -210,60 +366,99 @@ class YouTubeMonitor:
         # If we get here, all retries failed
         raise last_error or Exception("All API keys exhausted")
         
-    def _parse_duration(self, duration_str):
-        """Parse ISO 8601 duration string to seconds"""
-        # Parse duration like "PT1M30S" to seconds
-        match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration_str)
-        if match:
-            hours = int(match.group(1) or 0)
-            minutes = int(match.group(2) or 0)
-            seconds = int(match.group(3) or 0)
-            return hours * 3600 + minutes * 60 + seconds
-        return 0
+    def _execute_conditional(self, cache_key, request):
+        """Execute a list request with If-None-Match, reusing the cached body on 304"""
+        with self._etag_lock:
+            cached = self._etag_cache.get(cache_key)
+            if cached:
+                self._etag_cache.move_to_end(cache_key)
+        if cached:
+            request.headers['If-None-Match'] = cached[0]
+            
+        try:
+            response = self._execute(request)
+        except HttpError as e:
+            if cached and e.resp.status == 304:
+                return cached[1]
+            raise
+            
+        if response.get('etag'):
+            with self._etag_lock:
+                self._etag_cache[cache_key] = (response['etag'], response)
+                self._etag_cache.move_to_end(cache_key)
+                if len(self._etag_cache) > Config.ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+        return response
         
-    def _is_short_video(self, duration_str):
-        """Check if video is a short (under 3 minutes / 180 seconds)"""
-        duration_seconds = self._parse_duration(duration_str)
-        return duration_seconds <= 180
+    def _parse_channel(self, channel_data):
+        """Build the channel info dict from a channels().list item"""
+        return {
+            'channel_id': channel_data['id'],
+            'title': channel_data['snippet']['title'],
+            'description': channel_data['snippet'].get('description', ''),
+            'thumbnail_url': channel_data['snippet']['thumbnails']['default']['url'],
+            'subscriber_count': int(channel_data['statistics'].get('subscriberCount', 0)),
+            'video_count': int(channel_data['statistics'].get('videoCount', 0)),
+            'upload_playlist_id': channel_data['contentDetails']['relatedPlaylists']['uploads'],
+            'is_active': True,
+            'last_checked': datetime.now(timezone.utc)
+        }
         
     def get_channel_info(self, channel_id):
         """Get channel information"""
         def make_request():
-            return self.youtube.channels().list(
+            return self._execute_conditional(('channels', channel_id), self.youtube.channels().list(
                 part='snippet,statistics,contentDetails',
                 id=channel_id
-            ).execute()
+            ))
             
         try:
             result = self._api_request_with_retry(make_request)
             self.add_quota_usage(1)
             
             if result['items']:
-                channel_data = result['items'][0]
-                return {
-                    'channel_id': channel_data['id'],
-                    'title': channel_data['snippet']['title'],
-                    'description': channel_data['snippet'].get('description', ''),
-                    'thumbnail_url': channel_data['snippet']['thumbnails']['default']['url'],
-                    'subscriber_count': int(channel_data['statistics'].get('subscriberCount', 0)),
-                    'video_count': int(channel_data['statistics'].get('videoCount', 0)),
-                    'upload_playlist_id': channel_data['contentDetails']['relatedPlaylists']['uploads'],
-                    'is_active': True,
-                    'last_checked': datetime.now(timezone.utc)
-                }
+                return self._parse_channel(result['items'][0])
         except Exception as e:
             logger.error(f"Error getting channel info for {channel_id}: {e}")
             return None
             
+    def get_channels_info(self, channel_ids):
+        """Get channel information for many channels, 50 IDs per request"""
+        channels = {}
+        for i in range(0, len(channel_ids), 50):
+            batch_ids = channel_ids[i:i+50]
+            
+            def make_request():
+                return self._execute_conditional(('channels', *batch_ids), self.youtube.channels().list(
+                    part='snippet,statistics,contentDetails',
+                    id=','.join(batch_ids),
+                    maxResults=50
+                ))
+                
+            try:
+                result = self._api_request_with_retry(make_request)
+                self.add_quota_usage(1)
+                
+                for channel_data in result.get('items', []):
+                    channels[channel_data['id']] = self._parse_channel(channel_data)
+            except Exception as e:
+                logger.error(f"Error getting channel info for {len(batch_ids)} channels: {e}")
+                
+        return channels
+        
     def search_channel_by_handle(self, handle):
         """Search for channel by handle using YouTube API"""
+        channel_id = self._handle_channel_ids.get(handle.lower())
+        if channel_id:
+            return self.get_channel_info(channel_id)
+            
         def make_request():
-            return self.youtube.search().list(
+            return self._execute(self.youtube.search().list(
                 part='snippet',
                 q=handle,
                 type='channel',
                 maxResults=1
-            ).execute()
+            ))
             
         try:
             result = self._api_request_with_retry(make_request)
@@ -271,6 +466,7 @@ class YouTubeMonitor:
             
             if result['items']:
                 channel_id = result['items'][0]['snippet']['channelId']
+                self._handle_channel_ids[handle.lower()] = channel_id
                 # Now get full channel info
                 return self.get_channel_info(channel_id)
             else:
@@ -288,13 +484,16 @@ class YouTubeMonitor:
         
         while len(videos) < max_results:
             def make_request():
+                page_size = min(50, max_results - len(videos))
                 request = self.youtube.playlistItems().list(
                     part="snippet,contentDetails",
                     playlistId=playlist_id,
-                    maxResults=min(50, max_results - len(videos)),
+                    maxResults=page_size,
                     pageToken=next_page_token
                 )
-                response = request.execute()
+                response = self._execute_conditional(
+                    ('playlistItems', playlist_id, page_size, next_page_token), request
+                )
                 self.add_quota_usage(1)
                 return response
                 
@@ -327,6 +526,14 @@ class YouTubeMonitor:
         if not video_ids:
             return {}
             
+        # Once every key is past the emergency threshold, rotation leaves us on an exhausted key
+        with self._key_lock:
+            key_usage = self._get_current_key_usage()
+            quota_exhausted = not key_usage or key_usage.quota_used >= Config.QUOTA_EMERGENCY_THRESHOLD
+        if YoutubeDL and quota_exhausted:
+            logger.warning(f"API quota exhausted, fetching {len(video_ids)} video stats with yt-dlp")
+            return self.get_video_statistics_ytdlp(video_ids)
+            
         stats = {}
         for i in range(0, len(video_ids), 50):
             batch_ids = video_ids[i:i+50]
@@ -336,7 +543,7 @@ class YouTubeMonitor:
                     part="statistics,contentDetails,snippet",
                     id=','.join(batch_ids)
                 )
-                response = request.execute()
+                response = self._execute(request)
                 self.add_quota_usage(1)
                 return response
                 
@@ -345,7 +552,7 @@ class YouTubeMonitor:
                 
                 for item in response.get('items', []):
                     duration_str = item['contentDetails']['duration']
-                    duration_seconds = self._parse_duration(duration_str)
+                    duration_seconds = parse_duration(duration_str)
                     
                     # Multiple methods to detect shorts
                     is_short_duration = duration_seconds <= 180
@@ -387,19 +594,69 @@ class YouTubeMonitor:
                 
         return stats
         
-    def monitor_channel(self, channel_id):
+    def _extract_video_info(self, video_id):
+        """Fetch one video's metadata with yt-dlp, without using API quota"""
+        options = {'quiet': True, 'no_warnings': True, 'skip_download': True}
+        try:
+            with YoutubeDL(options) as ydl:
+                return ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+        except Exception as e:
+            logger.error(f"yt-dlp could not fetch video {video_id}: {e}")
+            return None
+            
+    def get_video_statistics_ytdlp(self, video_ids):
+        """Fetch the same statistics as get_video_statistics using yt-dlp instead of the API"""
+        stats = {}
+        with ThreadPoolExecutor(max_workers=Config.YTDLP_MAX_WORKERS) as executor:
+            for video_id, info in zip(video_ids, executor.map(self._extract_video_info, video_ids)):
+                if not info:
+                    continue
+                    
+                duration_seconds = int(info.get('duration') or 0)
+                title = info.get('title') or ''
+                description = info.get('description') or ''
+                
+                is_short_duration = duration_seconds <= 180
+                has_shorts_hashtag = '#shorts' in title.lower() or '#shorts' in description.lower()
+                
+                stats[video_id] = {
+                    'view_count': int(info.get('view_count') or 0),
+                    'like_count': int(info.get('like_count') or 0),
+                    'comment_count': int(info.get('comment_count') or 0),
+                    'duration': f"PT{duration_seconds}S",
+                    'duration_seconds': duration_seconds,
+                    'is_short': is_short_duration or has_shorts_hashtag,
+                    'is_short_duration': is_short_duration,
+                    'has_shorts_hashtag': has_shorts_hashtag,
+                    'is_short_type': False,
+                    'title': title,
+                    'description': description
+                }
+                
+        return stats
+        
+    def monitor_channel(self, channel_id, channel_info=None, skip_if_unchanged=False, known_stats=None):
         """Complete monitoring flow for a channel - SHORTS ONLY"""
+        # A session per call lets several channels be monitored from worker threads at once
+        with SessionLocal() as db:
+            new_videos = self._monitor_channel(db, channel_id, channel_info, skip_if_unchanged, known_stats)
+        self.commit_quota_usage()
+        return new_videos
+        
+    def _monitor_channel(self, db, channel_id, channel_info, skip_if_unchanged, known_stats=None):
+        """Store a channel's latest SHORT videos and view snapshots using the given session"""
         try:
-            # Get or update channel info
-            channel_info = self.get_channel_info(channel_id)
+            # Get or update channel info, unless the caller already batch-fetched it
+            if channel_info is None:
+                channel_info = self.get_channel_info(channel_id)
             if not channel_info:
                 return
                 
             # Update database
-            channel = self.db.query(Channel).filter_by(channel_id=channel_id).first()
+            channel = db.get(Channel, channel_id)
             if not channel:
                 channel = Channel(**channel_info)
-                self.db.add(channel)
+                db.add(channel)
             else:
                 for key, value in channel_info.items():
                     setattr(channel, key, value)
@@ -407,15 +664,36 @@ class YouTubeMonitor:
             
             # Get recent videos
             videos = self.get_playlist_videos(channel_info['upload_playlist_id'], max_results=50)
+            latest_upload_id = videos[0]['video_id'] if videos else None
             
-            # Get video statistics
+            # Nothing was uploaded since the last check, so there's no new video to find
+            if skip_if_unchanged and latest_upload_id and latest_upload_id == self._latest_upload_ids.get(channel_id):
+                db.commit()
+                logger.info(f"Channel {channel_info['title']}: no new uploads")
+                return []
+                
+            # Get video statistics, reusing any the caller already fetched this cycle
             video_ids = [v['video_id'] for v in videos]
-            stats = self.get_video_statistics(video_ids)
+            known_stats = known_stats or {}
+            stats = {video_id: known_stats[video_id] for video_id in video_ids if video_id in known_stats}
+            missing_ids = [video_id for video_id in video_ids if video_id not in stats]
+            if missing_ids:
+                stats.update(self.get_video_statistics(missing_ids))
+            
+            # Load the shorts already stored with one IN query instead of a lookup per video
+            short_ids = [video_id for video_id, video_stats in stats.items() if video_stats.get('is_short', False)]
+            existing_videos = {
+                video.video_id: video
+                for video in db.scalars(select(Video).where(Video.video_id.in_(short_ids)))
+            } if short_ids else {}
             
             # Process each video - FILTER FOR SHORTS ONLY
             new_videos = []
+            snapshot_rows = []
             short_videos_count = 0
             total_videos_count = 0
+            # One timestamp for every video updated in this check
+            now = datetime.now(timezone.utc)
             
             for video_data in videos:
                 video_id = video_data['video_id']
@@ -436,7 +714,7 @@ class YouTubeMonitor:
                 video_data.update(video_stats)
                 
                 # Check if video exists
-                video = self.db.query(Video).filter_by(video_id=video_id).first()
+                video = existing_videos.get(video_id)
                 if not video:
                     # Convert published_at to timezone-aware datetime
                     published_at = datetime.fromisoformat(
@@ -453,14 +731,14 @@ class YouTubeMonitor:
                     filtered_video_data = {k: v for k, v in video_data.items() if k in video_fields}
                     
                     video = Video(**filtered_video_data)
-                    self.db.add(video)
+                    db.add(video)
                     new_videos.append(video_data)
                     logger.info(f"New short video detected: {video_data['title']} ({video_stats.get('duration_seconds', 0)}s)")
                 else:
                     # Update statistics
                     for key in ['view_count', 'like_count', 'comment_count']:
                         setattr(video, key, video_data[key])
-                    video.last_updated = datetime.now(timezone.utc)
+                    video.last_updated = now
                     
                 # Record view snapshot
                 # Use the published_at from video_data if it exists, otherwise from the video object
@@ -476,24 +754,33 @@ class YouTubeMonitor:
                     # If it's a naive datetime, assume UTC
                     published_at = published_at.replace(tzinfo=timezone.utc)
                     
-                hours_since_upload = (datetime.now(timezone.utc) - published_at).total_seconds() / 3600
+                hours_since_upload = (now - published_at).total_seconds() / 3600
                 
-                snapshot = ViewSnapshot(
-                    video_id=video_id,
-                    view_count=video_data['view_count'],
-                    hours_since_upload=hours_since_upload
-                )
-                self.db.add(snapshot)
+                snapshot_rows.append({
+                    'video_id': video_id,
+                    'view_count': video_data['view_count'],
+                    'hours_since_upload': hours_since_upload
+                })
                 
             logger.info(f"Channel {channel_info['title']}: {short_videos_count}/{total_videos_count} videos are shorts")
-            self.db.commit()
+            
+            # Write all of this channel's snapshots as one executemany INSERT
+            if snapshot_rows:
+                db.execute(insert(ViewSnapshot), snapshot_rows)
+            db.commit()
+            
+            # Only trust the upload for skipping once every video on the page got stats;
+            # otherwise a short whose lookup failed would never be stored
+            if all(video['video_id'] in stats for video in videos):
+                self._latest_upload_ids[channel_id] = latest_upload_id
             return new_videos
             
         except Exception as e:
             logger.error(f"Error monitoring channel {channel_id}: {e}")
-            self.db.rollback()
+            db.rollback()
             return []
             
     def close(self):
         """Clean up database connection"""
+        self.commit_quota_usage()
         self.db.close() 
\ No newline at end of file